@@ -1,10 +1,16 @@
 # File: src_streamlit/app.py
+import os
+import numpy as np
 import streamlit as st
 from src_streamlit.quantum_data_loader import (
-    get_display_text, get_barchart_data, get_map_layers_data, get_map_styles
+    get_display_text, get_barchart_data, get_barchart_table, get_map_layers_data, get_map_layer_names, get_map_styles,
+    get_proximity, get_proximity_config, get_scenario_model, get_custom_scenario_table, get_scenario_sweep,
+    with_custom_scenario, get_cache_stats, CUSTOM_SCENARIO, MAP_VIEWPORT, MAX_MAP_POINTS, MAP_CLUSTER_ZOOM
 )
+from src_streamlit.metrics import timer
 from io_utils.display import (
-    show_header_text, show_resource_bar_charts, show_geographic_map
+    show_header_text, show_resource_bar_charts, show_geographic_map, show_proximity_table, show_sensitivity_chart,
+    show_metrics_panel
 )
 
 st.set_page_config(layout="wide", page_title="Quantum Impact Dashboard")
@@ -12,45 +18,119 @@ st.set_page_config(layout="wide", page_title="Quantum Impact Dashboard")
 # --- 1. Load Data ---
 text_data = get_display_text()
 chart_data = get_barchart_data()
-map_layers = get_map_layers_data()
+chart_table = get_barchart_table()
+layer_names = get_map_layer_names()
 map_styles = get_map_styles()
 
 content = text_data.get('content', {})
 res_config = text_data.get('bar_chart_info', {})
 
-# --- 2. Sidebar ---
-st.sidebar.header("Configuration")
-selected_layers = st.sidebar.multiselect("Map Layers:", list(map_layers.keys()), default=list(map_layers.keys()))
-
-# Determine available scales from data
+# Determine available scenarios and scales from data
 SCENARIOS = list(chart_data.keys()) if chart_data else []
 sample_entries = chart_data.get(SCENARIOS[0], []) if SCENARIOS else []
 SCALES = sorted(list(set(e.get('scale') for e in sample_entries if 'scale' in e)))
-selected_scale = st.sidebar.selectbox("FTQC System Configuration:", SCALES, index=0)
 
-# --- 3. Main Content ---
-show_header_text(content)
 
-left_col, right_col = st.columns([1, 1])
+# --- 2. Independently rerunning sections ---
+# Each section owns its widgets inside an st.fragment: changing the FTQC configuration reruns only the
+# charts, toggling layers reruns only the map (fragment widgets cannot live in the sidebar).
+@st.fragment
+def resource_section(chart_table, scenarios):
+    selected_scale = st.selectbox("FTQC System Configuration:", SCALES, index=0)
 
-with left_col:
-    st.subheader("Energy and Resource Consumption")
-    if 'scenarios_markdown' in content: st.markdown(content['scenarios_markdown'])
+    # Custom scenario evaluated by the parametric model, starting from the selected configuration's assumptions
+    scenario_model = get_scenario_model()
+    custom_inputs = None
+    if scenario_model and selected_scale in scenario_model.configurations:
+        with st.expander("Custom scenario"):
+            if st.checkbox("Add custom scenario", value=False):
+                ref = scenario_model.defaults(selected_scale)
+                custom_inputs = {
+                    "penetration": st.slider("Penetration rate (%):", 1, 100,
+                                             int(round(ref['penetration'] * 100))) / 100,
+                    "logical_qubits": st.number_input("Logical qubits:", 1, 1_000_000, int(ref['logical_qubits'])),
+                    "physical_per_logical": st.number_input("Physical qubits per logical qubit:", 1, 100_000,
+                                                            int(ref['physical_per_logical'])),
+                    "qubit_density": st.select_slider("Cryostat qubit density (x reference):",
+                                                      options=[0.25, 0.5, 1.0, 2.0, 4.0], value=1.0),
+                }
+
+    if custom_inputs:
+        chart_table = with_custom_scenario(chart_table, get_custom_scenario_table(selected_scale, **custom_inputs))
+        scenarios = scenarios + [CUSTOM_SCENARIO]
 
     show_resource_bar_charts(
         RESOURCES=list(res_config.get('labels', {}).keys()),
-        SCENARIOS=SCENARIOS,
-        chart_data=chart_data,
+        SCENARIOS=scenarios,
+        chart_data=chart_table,
         selected_scale=selected_scale,
         labels=res_config.get('labels', {}),
         units=res_config.get('units', {})
     )
 
+    if custom_inputs:
+        with st.expander("Custom scenario sensitivity"):
+            parameter = st.selectbox("Input to sweep:", list(custom_inputs))
+            current = custom_inputs[parameter]
+            low = 0.01 if parameter == 'penetration' else current / 4
+            high = 1.0 if parameter == 'penetration' else current * 4
+            sweep_values = tuple(sorted({*np.geomspace(low, high, 41).tolist(), current}))
+            fixed = {k: v for k, v in custom_inputs.items() if k != parameter}
+            sweep = get_scenario_sweep(selected_scale, parameter, sweep_values, **fixed)
+            show_sensitivity_chart(sweep, current, parameter, res_config.get('labels', {}))
+
+
+@st.fragment
+def map_section():
+    selected_layers = st.multiselect("Map Layers:", layer_names, default=layer_names)
+
+    proximity_config = get_proximity_config()
+    show_links = False
+    if proximity_config.get('source') in layer_names and proximity_config.get('target') in layer_names:
+        with st.expander("Nearest data centers"):
+            show_links = st.checkbox("Show nearest data centers", value=False)
+            proximity_k = st.slider("Nearest data centers per R&D center:", 1, 10, int(proximity_config['k']))
+            proximity_radius = st.number_input("Search radius (km):", min_value=1.0, max_value=2000.0,
+                                               value=float(proximity_config['radius_km']), step=10.0)
+
+    # Loaded after the charts are drawn, and only for the selected layers
+    with timer("load_map_layers"):
+        map_layers, failed_layers = get_map_layers_data(bbox=MAP_VIEWPORT, max_points=MAX_MAP_POINTS,
+                                                        cluster_zoom=MAP_CLUSTER_ZOOM, layers=tuple(selected_layers))
+    for name, error in failed_layers.items():
+        st.warning(f"{name}: {error}")
+    proximity = None
+    if show_links:
+        try:
+            proximity = get_proximity(proximity_config['source'], proximity_config['target'],
+                                      k=proximity_k, radius_km=proximity_radius, bbox=MAP_VIEWPORT)
+        except Exception as e:
+            st.warning(f"Nearest data centers unavailable: {e}")
+    show_geographic_map(selected_layers, map_layers, map_styles, bounds=MAP_VIEWPORT,
+                        links=proximity['pairs'] if proximity else None)
+    if proximity:
+        show_proximity_table(proximity['summary'])
+
+
+# --- 3. Main Content ---
+show_header_text(content)
+
+left_col, right_col = st.columns([1, 1])
+
+with left_col:
+    st.subheader("Energy and Resource Consumption")
+    if 'scenarios_markdown' in content: st.markdown(content['scenarios_markdown'])
+    resource_section(chart_table, SCENARIOS)
+
 with right_col:
     st.subheader("Geographic Distribution")
     if 'map_markdown' in content: st.markdown(content['map_markdown'])
-
-    show_geographic_map(selected_layers, map_layers, map_styles)
+    map_section()
 
     st.subheader("Authors")
-    if 'team_markdown' in content: st.markdown(content['team_markdown'])
\ No newline at end of file
+    if 'team_markdown' in content: st.markdown(content['team_markdown'])
+
+# --- 4. Admin ---
+# Hidden performance panel: open the app with ?admin=1 (or set DASHBOARD_ADMIN=1)
+if st.query_params.get("admin") == "1" or os.getenv("DASHBOARD_ADMIN") == "1":
+    show_metrics_panel(get_cache_stats())
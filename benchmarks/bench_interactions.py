@@ -0,0 +1,113 @@
+# File: benchmarks/bench_interactions.py
+"""
+Per-interaction latency and payload of the running dashboard, measured through a headless
+websocket session (see streamlit_session.py) against a synthetic local DuckDB.
+
+    python -m benchmarks.bench_interactions [--repeat 10] [--data-centers 50000] [--app app.py]
+
+Interactions: toggling a map layer and changing the FTQC configuration. Each is timed from the
+rerun request to `script_finished`; bytes are what the browser receives for that rerun.
+"""
+import argparse, asyncio, json, statistics, subprocess, tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from benchmarks.bench_suite import _synthetic_points
+from benchmarks.streamlit_session import ROOT, StreamlitSession, start_server, stop_server
+
+RESULTS_DIR = Path(__file__).parent / "results"
+LAYER_WIDGET = "Map Layers:"
+SCALE_WIDGET = "FTQC System Configuration:"
+
+
+def build_dashboard_db(path, quantum_rows=20, data_center_rows=50_000):
+    """Writes the two tables app.py reads (quantum_data_center, data_center_all) into a DuckDB file."""
+    import duckdb
+    import pandas as pd
+    con = duckdb.connect(str(path))
+    try:
+        for table, rows, seed in (("quantum_data_center", quantum_rows, 1), ("data_center_all", data_center_rows, 2)):
+            frame = pd.DataFrame(_synthetic_points(rows, seed))
+            con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM frame")
+    finally:
+        con.close()
+    return path
+
+
+def dashboard_env(db_path, snapshot_dir):
+    return {"PYTHONPATH": str(ROOT), "DASHBOARD_DUCKDB_PATH": str(db_path), "DASHBOARD_DUCKDB_EXTENSIONS": "",
+            "DASHBOARD_SNAPSHOT_DIR": str(snapshot_dir), "DASHBOARD_METRICS": "0"}
+
+
+async def measure(port, repeat):
+    session = await StreamlitSession(port).connect()
+    try:
+        first = await session.run()
+        await session.run()  # warm: layers and figures cached server-side
+        layers = session.widgets[LAYER_WIDGET]
+        scales = session.widgets[SCALE_WIDGET]
+        samples = {"layer_toggle": [], "scale_change": []}
+        all_layers, scale_options = layers.options, scales.options
+
+        for i in range(repeat):
+            selection = all_layers[:1] if i % 2 == 0 else all_layers
+            samples["layer_toggle"].append(await session.run({layers.label: selection}, fragment=True))
+            scale = scale_options[(i + 1) % len(scale_options)]
+            samples["scale_change"].append(await session.run({scales.label: scale}, fragment=True))
+    finally:
+        await session.close()
+
+    summary = {"first_run": {"seconds": round(first.seconds, 4), "bytes": first.bytes, "elements": first.elements}}
+    for name, runs in samples.items():
+        summary[name] = {
+            "p50_s": round(statistics.median(r.seconds for r in runs), 4),
+            "max_s": round(max(r.seconds for r in runs), 4),
+            "bytes": round(statistics.median(r.bytes for r in runs)),
+            "elements": round(statistics.median(r.elements for r in runs)),
+            "fragment_runs": sum(r.status == "FINISHED_FRAGMENT_RUN_SUCCESSFULLY" for r in runs),
+        }
+    return summary
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-interaction latency and payload benchmark")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--data-centers", type=int, default=50_000)
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    tmp = Path(tempfile.mkdtemp())
+    db_path = build_dashboard_db(tmp / "my_db.duckdb", data_center_rows=args.data_centers)
+    proc, port = start_server(args.app, env=dashboard_env(db_path, tmp / "snapshots"))
+    try:
+        summary = asyncio.run(measure(port, args.repeat))
+    finally:
+        stop_server(proc)
+
+    print(f"{'interaction':<14}{'p50 ms':>10}{'max ms':>10}{'kB':>10}{'elements':>10}")
+    print(f"{'first run':<14}{summary['first_run']['seconds'] * 1e3:>10.1f}{'':>10}"
+          f"{summary['first_run']['bytes'] / 1e3:>10.1f}{summary['first_run']['elements']:>10}")
+    for name in ("layer_toggle", "scale_change"):
+        s = summary[name]
+        print(f"{name:<14}{s['p50_s'] * 1e3:>10.1f}{s['max_s'] * 1e3:>10.1f}{s['bytes'] / 1e3:>10.1f}{s['elements']:>10}")
+
+    output = args.output or RESULTS_DIR / f"interactions-{_git_revision() or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(), "app": args.app, "repeat": args.repeat,
+        "data_centers": args.data_centers, **summary,
+    }, indent=2))
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# File: benchmarks/bench_load.py
+"""
+Concurrent-session load test: N headless browser sessions (see streamlit_session.py) drive one
+`streamlit run app.py` server backed by a synthetic local DuckDB standing in for MotherDuck.
+
+    python -m benchmarks.bench_load [--sessions 1,4,16] [--interactions 20] [--think-time 0.5]
+
+Each session loads the page, then cycles through scripted interactions (toggle map layers,
+change the FTQC configuration, open the custom scenario). Per session count, a fresh server is
+started and the report gives p50/p95/p99 rerun latency, reruns per second and server memory
+(resident set before the sessions connect, peak while they run, growth per session).
+"""
+import argparse, asyncio, json, random, tempfile, threading, time
+from datetime import datetime, timezone
+from pathlib import Path
+from benchmarks.bench_interactions import LAYER_WIDGET, SCALE_WIDGET, build_dashboard_db, dashboard_env, _git_revision
+from benchmarks.streamlit_session import StreamlitSession, start_server, stop_server
+
+RESULTS_DIR = Path(__file__).parent / "results"
+CUSTOM_WIDGET = "Add custom scenario"
+
+
+def _rss_mb(pid):
+    """Resident set size of a process in MB (Linux /proc); None where unavailable."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler(threading.Thread):
+    """Polls the server's resident set size in the background and keeps the peak."""
+
+    def __init__(self, pid, interval=0.1):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.peak = _rss_mb(pid)
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            rss = _rss_mb(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+def _script(session, step):
+    """The scripted interaction for one step: (name, {widget label: value}, fragment rerun)."""
+    layers, scales = session.widgets[LAYER_WIDGET], session.widgets[SCALE_WIDGET]
+    kind = step % 3
+    if kind == 0:
+        selection = layers.options[:1] if step % 2 == 0 else layers.options
+        return "layer_toggle", {layers.label: selection}, True
+    if kind == 1:
+        # Every third step is a scale change: cycle with the count of those, so each one picks a new option
+        return "scale_change", {scales.label: scales.options[(step // 3 + 1) % len(scales.options)]}, True
+    if CUSTOM_WIDGET in session.widgets:
+        return "custom_scenario", {CUSTOM_WIDGET: step % 2 == 0}, True
+    return "full_rerun", {}, False
+
+
+async def _drive(port, interactions, think_time, seed, samples, errors):
+    """One simulated user: first page load, then `interactions` scripted reruns."""
+    rng = random.Random(seed)
+    session = StreamlitSession(port)
+    try:
+        await session.connect()
+        first = await session.run()
+        samples.append(("first_run", first.seconds))
+        for step in range(interactions):
+            await asyncio.sleep(think_time * rng.uniform(0.5, 1.5))
+            name, changes, fragment = _script(session, step + seed)
+            stats = await session.run(changes, fragment=fragment)
+            samples.append((name, stats.seconds))
+    except Exception as e:
+        errors.append(f"session {seed}: {type(e).__name__}: {e}")
+    finally:
+        await session.close()
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def _latency(values):
+    if not values:
+        return {"count": 0}
+    return {"count": len(values), **{f"p{q}_ms": round(_percentile(values, q) * 1e3, 1) for q in (50, 95, 99)},
+            "max_ms": round(max(values) * 1e3, 1)}
+
+
+def run_level(app, env, sessions, interactions, think_time):
+    """Starts a fresh server, warms the loader cache with one session, then runs `sessions` concurrently."""
+    proc, port = start_server(app, env=env)
+    try:
+        asyncio.run(_drive(port, 0, 0, 0, [], []))  # warm: layers and figures cached server-side
+        baseline = _rss_mb(proc.pid)
+        sampler = RssSampler(proc.pid)
+        sampler.start()
+        samples, errors = [], []
+
+        async def all_sessions():
+            await asyncio.gather(*(_drive(port, interactions, think_time, i + 1, samples, errors)
+                                   for i in range(sessions)))
+
+        start = time.perf_counter()
+        asyncio.run(all_sessions())
+        elapsed = time.perf_counter() - start
+        peak = sampler.stop()
+    finally:
+        stop_server(proc)
+
+    reruns = [seconds for name, seconds in samples if name != "first_run"]
+    by_name = {}
+    for name, seconds in samples:
+        by_name.setdefault(name, []).append(seconds)
+    return {
+        "sessions": sessions,
+        "reruns": len(reruns),
+        "errors": errors,
+        "wall_s": round(elapsed, 3),
+        "throughput_rps": round(len(reruns) / elapsed, 2) if elapsed else None,
+        "latency": _latency(reruns),
+        "by_interaction": {name: _latency(values) for name, values in sorted(by_name.items())},
+        "rss_baseline_mb": round(baseline, 1) if baseline is not None else None,
+        "rss_peak_mb": round(peak, 1) if peak is not None else None,
+        "rss_per_session_mb": round((peak - baseline) / sessions, 2) if peak is not None and baseline else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the dashboard")
+    parser.add_argument("--sessions", default="1,4,16",
+                        help="Comma-separated concurrent session counts, one fresh server each")
+    parser.add_argument("--interactions", type=int, default=20, help="Scripted reruns per session")
+    parser.add_argument("--think-time", type=float, default=0.5,
+                        help="Mean pause (s) between a session's interactions; 0 for back-to-back reruns")
+    parser.add_argument("--data-centers", type=int, default=50_000)
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    tmp = Path(tempfile.mkdtemp())
+    db_path = build_dashboard_db(tmp / "my_db.duckdb", data_center_rows=args.data_centers)
+    env = dashboard_env(db_path, tmp / "snapshots")
+
+    results = []
+    print(f"{'sessions':>8}{'reruns':>8}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'rerun/s':>9}{'RSS MB':>9}{'MB/sess':>9}")
+    for sessions in levels:
+        result = run_level(args.app, env, sessions, args.interactions, args.think_time)
+        results.append(result)
+        lat = result["latency"]
+        print(f"{sessions:>8}{result['reruns']:>8}{len(result['errors']):>8}{lat.get('p50_ms', '-'):>9}"
+              f"{lat.get('p95_ms', '-'):>9}{lat.get('p99_ms', '-'):>9}{result['throughput_rps'] or '-':>9}"
+              f"{result['rss_peak_mb'] or '-':>9}{result['rss_per_session_mb'] or '-':>9}")
+        for error in result["errors"][:3]:
+            print(f"⚠️ {error}")
+
+    output = args.output or RESULTS_DIR / f"load-{_git_revision() or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(), "app": args.app, "interactions": args.interactions,
+        "think_time": args.think_time, "data_centers": args.data_centers, "levels": results,
+    }, indent=2))
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
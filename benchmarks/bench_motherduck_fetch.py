@@ -0,0 +1,73 @@
+# File: benchmarks/bench_motherduck_fetch.py
+"""
+Compares the legacy iterrows/ST_AsGeoJSON layer build against the columnar fetch path
+in `_fetch_from_motherduck`, using a local DuckDB file as a stand-in for MotherDuck.
+
+    python -m benchmarks.bench_motherduck_fetch [rows ...]
+"""
+import json, os, sys, tempfile, time
+from pathlib import Path
+import duckdb
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def build_table(db_path, rows):
+    """Creates my_db.main.bench_points with synthetic US-ish point rows."""
+    con = duckdb.connect(str(db_path))
+    con.execute(f"""
+        CREATE OR REPLACE TABLE bench_points AS
+        SELECT 'Site ' || i AS name,
+               'Operator ' || (i % 97) AS operator,
+               (i % 500)::DOUBLE AS capacity_mw,
+               25.0 + (hash(i) % 2400) / 100.0 AS Latitude,
+               -125.0 + (hash(i * 7) % 5800) / 100.0 AS Longitude
+        FROM range({rows}) t(i)
+    """)
+    con.close()
+
+
+def legacy_fetch(con, table_name):
+    """Pre-columnar implementation (geometry string built in SQL so no spatial extension is needed)."""
+    query = (f"SELECT *, '{{\"type\":\"Point\",\"coordinates\":[' || Longitude || ',' || Latitude || ']}}' "
+             f"AS geometry FROM {table_name}")
+    df = con.execute(query).df()
+    features = [
+        {
+            "type": "Feature",
+            "geometry": json.loads(row["geometry"]),
+            "properties": row.drop("geometry").to_dict()
+        }
+        for _, row in df.iterrows()
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+def main(sizes):
+    tmp = Path(tempfile.mkdtemp())
+    db_path = tmp / "my_db.duckdb"
+    os.environ["DASHBOARD_DUCKDB_PATH"] = str(db_path)
+    os.environ["DASHBOARD_DUCKDB_EXTENSIONS"] = ""
+    os.environ["DASHBOARD_SNAPSHOTS"] = "0"
+    from src_streamlit.quantum_data_loader import _fetch_from_motherduck
+
+    print(f"{'rows':>10} {'legacy rows/s':>15} {'columnar rows/s':>17} {'speedup':>8}")
+    for rows in sizes:
+        build_table(db_path, rows)
+
+        con = duckdb.connect(str(db_path))
+        start = time.perf_counter()
+        legacy = legacy_fetch(con, "my_db.main.bench_points")
+        legacy_s = time.perf_counter() - start
+        con.close()
+
+        start = time.perf_counter()
+        columnar = _fetch_from_motherduck("my_db.main.bench_points")
+        columnar_s = time.perf_counter() - start
+
+        assert len(legacy["features"]) == len(columnar) == rows
+        print(f"{rows:>10,} {rows / legacy_s:>15,.0f} {rows / columnar_s:>17,.0f} {legacy_s / columnar_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,87 @@
+# File: benchmarks/bench_startup.py
+"""
+Startup benchmark: import time of the app modules and time to first render of app.py,
+each measured in a fresh interpreter. Results are appended to
+benchmarks/results/startup.jsonl so they can be tracked across commits.
+
+    python -m benchmarks.bench_startup [--runs 5] [--import-budget 0.6] [--db my_db.duckdb]
+
+Exits with status 1 when the median import time exceeds --import-budget (seconds).
+"""
+import argparse, json, os, platform, statistics, subprocess, sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+RESULTS = Path(__file__).parent / "results" / "startup.jsonl"
+DEFAULT_IMPORT_BUDGET = 0.6
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import streamlit, src_streamlit.quantum_data_loader, io_utils.display
+print(time.perf_counter() - start)
+"""
+
+RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120).run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+
+def _run(snippet, env):
+    out = subprocess.run([sys.executable, "-c", snippet], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time and first-render benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=DEFAULT_IMPORT_BUDGET)
+    parser.add_argument("--db", default=None, help="local DuckDB file standing in for MotherDuck")
+    args = parser.parse_args(argv)
+
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "DASHBOARD_SNAPSHOTS": "0"}
+    if args.db:
+        env["DASHBOARD_DUCKDB_PATH"] = str(Path(args.db).resolve())
+        env.setdefault("DASHBOARD_DUCKDB_EXTENSIONS", "")
+
+    imports = [_run(IMPORT_SNIPPET, env) for _ in range(args.runs)]
+    renders = [_run(RENDER_SNIPPET, env) for _ in range(args.runs)]
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "import_s": round(statistics.median(imports), 4),
+        "first_render_s": round(statistics.median(renders), 4),
+        "runs": args.runs,
+        "import_budget_s": args.import_budget,
+    }
+    RESULTS.parent.mkdir(parents=True, exist_ok=True)
+    with open(RESULTS, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+
+    print(f"import: {result['import_s']:.3f}s (budget {args.import_budget:.3f}s)   "
+          f"first render: {result['first_render_s']:.3f}s")
+    if result["import_s"] > args.import_budget:
+        print("❌ Import-time budget exceeded")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
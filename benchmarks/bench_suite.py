@@ -0,0 +1,253 @@
+# File: benchmarks/bench_suite.py
+"""
+Scaling benchmark for the loader and display hot paths on synthetic layers.
+
+For every size, a seeded generator writes the same point table into a local DuckDB file
+(standing in for MotherDuck as my_db.main.points_<rows>) and into a GeoJSON file. Each
+(case, size) then runs in a fresh interpreter, recording median wall time, peak RSS and
+peak traced allocations (plus the browser payload size for the map); the run is written to benchmarks/results/suite-<rev>-<time>.json.
+
+    python -m benchmarks.bench_suite [--sizes 10000 100000 1000000 5000000] [--repeat 3]
+    python -m benchmarks.bench_suite --compare old.json new.json
+
+Generated data is kept in --data-dir (default: .bench_data) and reused by later runs.
+"""
+import argparse, json, os, platform, resource, statistics, subprocess, sys, time, tracemalloc, zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_DATA_DIR = ROOT / ".bench_data"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+# Cases whose input is a tree of Python dicts (GeoJSON FeatureCollection, bar_chart_data) need several GB
+# per million rows; above this size they only measure swapping and are skipped
+DEFAULT_OBJECT_LIMIT = 1_000_000
+CASES = ["load_geojson_file", "fetch_from_motherduck", "extract_points", "map_figure", "bar_aggregation"]
+OBJECT_CASES = {"load_geojson_file", "extract_points", "bar_aggregation"}
+SEED = 42
+
+
+# --- 1. Synthetic data ---
+def _synthetic_points(rows, seed=SEED):
+    """US-shaped point cloud: 70% clustered around 50 metro centres, 30% spread uniformly."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    centres = np.column_stack([rng.uniform(26, 48, 50), rng.uniform(-123, -70, 50)])
+    clustered = int(rows * 0.7)
+    picks = centres[rng.integers(0, len(centres), clustered)]
+    lat = np.concatenate([picks[:, 0] + rng.normal(0, 1.5, clustered), rng.uniform(25, 49, rows - clustered)])
+    lon = np.concatenate([picks[:, 1] + rng.normal(0, 1.5, clustered), rng.uniform(-125, -67, rows - clustered)])
+    return {
+        "name": np.char.add("Site ", np.arange(rows).astype(str)).astype(object),
+        "operator": np.char.add("Operator ", (np.arange(rows) % 97).astype(str)).astype(object),
+        "capacity_mw": rng.gamma(2.0, 20.0, rows).round(1),
+        "Latitude": lat.clip(20, 55),
+        "Longitude": lon.clip(-135, -60),
+    }
+
+
+def generate(data_dir, rows, seed=SEED):
+    """Writes points_<rows> into <data_dir>/my_db.duckdb and <data_dir>/points_<rows>.geojson (once)."""
+    import duckdb
+    import pandas as pd
+    data_dir.mkdir(parents=True, exist_ok=True)
+    table, geojson = f"points_{rows}", data_dir / f"points_{rows}.geojson"
+
+    con = duckdb.connect(str(data_dir / "my_db.duckdb"))
+    try:
+        exists = con.execute("SELECT count(*) FROM duckdb_tables() WHERE table_name = ?", [table]).fetchone()[0]
+        if not exists:
+            frame = pd.DataFrame(_synthetic_points(rows, seed))
+            con.execute(f"CREATE TABLE {table} AS SELECT * FROM frame")
+        if not geojson.exists():
+            # FeatureCollection = header + DuckDB's JSON array of features + footer, streamed to disk
+            features = data_dir / f"{table}.features.json"
+            con.execute(f"""
+                COPY (
+                    SELECT 'Feature' AS type,
+                           {{'type': 'Point', 'coordinates': [Longitude, Latitude]}} AS geometry,
+                           {{'name': name, 'operator': operator, 'capacity_mw': capacity_mw}} AS properties
+                    FROM {table}
+                ) TO '{features}' (FORMAT json, ARRAY true)
+            """)
+            with open(geojson, "w", encoding="utf-8") as out, open(features, encoding="utf-8") as src:
+                out.write('{"type": "FeatureCollection", "features": ')
+                while chunk := src.read(1 << 24):
+                    out.write(chunk)
+                out.write("}")
+            features.unlink()
+    finally:
+        con.close()
+    return table, geojson
+
+
+def _synthetic_chart_data(rows, seed=SEED):
+    """bar_chart_data-shaped dict with `rows` entries spread over 4 scenarios and 10 scales."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    resources = ["electricity", "water", "ln2", "he4", "he3"]
+    values = rng.lognormal(8, 3, (rows, len(resources)))
+    scenarios = {}
+    for i in range(rows):
+        entry = {"scale": f"Scale {i % 10}"}
+        for j, r in enumerate(resources):
+            entry[r] = float(values[i, j])
+            entry[f"{r}Err"] = float(values[i, j] * 0.1)
+        scenarios.setdefault(f"Scenario {i % 4}", []).append(entry)
+    return scenarios
+
+
+# --- 2. Cases (run inside the worker process) ---
+def _setup(case, rows, data_dir):
+    """Returns the zero-argument callable to time for one case."""
+    from src_streamlit import quantum_data_loader as loader
+    table, geojson = f"my_db.main.points_{rows}", str(data_dir / f"points_{rows}.geojson")
+
+    if case == "load_geojson_file":
+        return lambda: loader._load_geojson_file(geojson)
+    if case == "fetch_from_motherduck":
+        return lambda: loader._fetch_from_motherduck(table)
+    if case == "extract_points":
+        gj = loader._load_geojson_file(geojson)
+        return lambda: loader._extract_points(gj)
+    if case == "map_figure":
+        # Figure build + the JSON spec st.plotly_chart sends to the browser
+        import plotly.io as pio
+        from io_utils.display import _geographic_figure
+        layer = loader._fetch_from_motherduck(table)
+        styles = {"defaults": {"color": "red", "size": 8, "opacity": 0.7}, "layers": {}}
+        return lambda: pio.to_json(_geographic_figure(["bench"], {"bench": layer}, styles, loader.MAP_VIEWPORT),
+                                   validate=False)
+    if case == "bar_aggregation":
+        chart_data = _synthetic_chart_data(rows)
+        return lambda: loader._index_barchart_data(chart_data)
+    raise ValueError(f"Unknown case: {case}")
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def run_case(case, rows, data_dir, repeat):
+    """Times one case `repeat` times, then once more under tracemalloc for the allocation peak."""
+    fn = _setup(case, rows, data_dir)
+    rss_before = _peak_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        timings.append(time.perf_counter() - start)
+    rss_peak = _peak_rss_mb()
+
+    tracemalloc.start()
+    fn()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "case": case, "rows": rows,
+        "wall_s": round(statistics.median(timings), 5), "min_s": round(min(timings), 5),
+        "rows_per_s": round(rows / statistics.median(timings)),
+        "peak_rss_mb": round(rss_peak, 1), "setup_rss_mb": round(rss_before, 1),
+        "alloc_peak_mb": round(alloc_peak / 1e6, 2),
+    }
+    if isinstance(output, str):
+        # Serialized payloads (map spec): raw and deflated size as sent over a compressed websocket
+        result["payload_kb"] = round(len(output) / 1e3, 1)
+        result["payload_deflate_kb"] = round(len(zlib.compress(output.encode(), 6)) / 1e3, 1)
+    return result
+
+
+# --- 3. Driver ---
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(sizes, cases, data_dir, repeat, object_limit):
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "DASHBOARD_DUCKDB_PATH": str(data_dir / "my_db.duckdb"),
+           "DASHBOARD_DUCKDB_EXTENSIONS": "", "DASHBOARD_SNAPSHOTS": "0", "DASHBOARD_METRICS": "0"}
+    results = []
+    print(f"{'case':<24}{'rows':>11}{'wall s':>10}{'rows/s':>13}{'peak RSS MB':>13}{'alloc MB':>10}")
+    for rows in sizes:
+        start = time.perf_counter()
+        generate(data_dir, rows)
+        print(f"-- {rows:,} rows ready in {time.perf_counter() - start:.1f}s")
+        for case in cases:
+            if case in OBJECT_CASES and rows > object_limit:
+                continue
+            proc = subprocess.run([sys.executable, "-m", "benchmarks.bench_suite", "--worker", case, str(rows),
+                                   "--data-dir", str(data_dir), "--repeat", str(repeat)],
+                                  cwd=ROOT, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                error = proc.stderr.strip()[-2000:] or f"exit status {proc.returncode}"
+                print(f"❌ {case} @ {rows:,}: {error.splitlines()[-1]}")
+                results.append({"case": case, "rows": rows, "error": error})
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append(r)
+            print(f"{case:<24}{rows:>11,}{r['wall_s']:>10.3f}{r['rows_per_s']:>13,}"
+                  f"{r['peak_rss_mb']:>13.1f}{r['alloc_peak_mb']:>10.1f}")
+    return results
+
+
+def compare(old_path, new_path):
+    """Prints the wall-time ratio new/old for every (case, rows) present in both runs."""
+    def index(path):
+        return {(r["case"], r["rows"]): r for r in json.loads(Path(path).read_text())["results"] if "error" not in r}
+
+    old, new = index(old_path), index(new_path)
+    print(f"{'case':<24}{'rows':>11}{'old s':>10}{'new s':>10}{'ratio':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key]["wall_s"] / old[key]["wall_s"] if old[key]["wall_s"] else float("inf")
+        flag = "  ⚠️" if ratio > 1.2 else ""
+        print(f"{key[0]:<24}{key[1]:>11,}{old[key]['wall_s']:>10.3f}{new[key]['wall_s']:>10.3f}{ratio:>7.2f}x{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Loader/display scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--object-limit", type=int, default=DEFAULT_OBJECT_LIMIT,
+                        help="skip GeoJSON and bar-chart cases above this many rows")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--worker", nargs=2, metavar=("CASE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.worker:
+        print(json.dumps(run_case(args.worker[0], int(args.worker[1]), args.data_dir, args.repeat)))
+        return
+
+    data_dir = args.data_dir.resolve()
+    revision = _git_revision()
+    started = datetime.now(timezone.utc)
+    results = run_suite(args.sizes, args.cases, data_dir, args.repeat, args.object_limit)
+
+    output = args.output or RESULTS_DIR / f"suite-{revision or 'local'}-{started:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "timestamp": started.isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "seed": SEED,
+        "repeat": args.repeat,
+        "results": results,
+    }, indent=2))
+    print(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
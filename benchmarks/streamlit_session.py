@@ -0,0 +1,166 @@
+# File: benchmarks/streamlit_session.py
+"""
+Headless Streamlit client for benchmarks: drives a running `streamlit run` server over the same
+websocket protocol (BackMsg/ForwardMsg protobufs) the browser uses, and measures every script
+run: wall time until `script_finished` and the bytes the browser would receive.
+
+Like the browser, a session reports the hashes of cacheable messages it already holds, so the
+server answers unchanged large elements with references instead of resending them.
+"""
+import asyncio, os, socket, subprocess, sys, tempfile, time, urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from tornado.httpclient import HTTPRequest
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = Path(__file__).parent.parent
+
+# Widget element type -> WidgetState field carrying its value
+WIDGET_VALUE_FIELDS = {
+    "selectbox": "string_value",
+    "multiselect": "string_array_value",
+    "checkbox": "bool_value",
+    "number_input": "double_value",
+    "slider": "double_array_value",
+}
+
+
+@dataclass
+class RunStats:
+    seconds: float
+    bytes: int
+    messages: int
+    elements: int
+    status: str
+
+
+@dataclass
+class Widget:
+    kind: str
+    id: str
+    label: str
+    fragment_id: str
+    options: list
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app="app.py", env=None, port=None, timeout=60):
+    """Starts `streamlit run <app>` headless from the project root; returns (process, port)."""
+    port = port or free_port()
+    cmd = [sys.executable, "-m", "streamlit", "run", str(app), "--server.headless", "true",
+           "--server.port", str(port), "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"]
+    # stderr goes to a file: an unread pipe fills up under load and blocks the server
+    log = tempfile.TemporaryFile(mode="w+")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env={**os.environ, **(env or {})},
+                            stdout=subprocess.DEVNULL, stderr=log, text=True)
+    proc.log = log
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"streamlit exited: {log.read()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise TimeoutError(f"streamlit did not become healthy on port {port} within {timeout}s")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+    proc.log.close()
+
+
+class StreamlitSession:
+    """One browser-like session: connect(), run() the script, change widgets and rerun."""
+
+    def __init__(self, port, host="127.0.0.1", query_string=""):
+        self.url = f"ws://{host}:{port}/_stcore/stream"
+        self.query_string = query_string
+        self.widgets = {}       # label -> Widget (latest run)
+        self.values = {}        # widget id -> value sent with every rerun
+        self._cached_hashes = set()
+        self._ws = None
+
+    async def connect(self):
+        self._ws = await websocket_connect(HTTPRequest(self.url), subprotocols=["streamlit"],
+                                           max_message_size=1 << 30)
+        return self
+
+    async def close(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+    def _client_state(self, fragment_id=None):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = self.query_string
+        state.cached_message_hashes.extend(sorted(self._cached_hashes))
+        if fragment_id:
+            state.fragment_id = fragment_id
+        for widget_id, (kind, value) in self.values.items():
+            ws = state.widget_states.widgets.add()
+            ws.id = widget_id
+            field = WIDGET_VALUE_FIELDS[kind]
+            if field.endswith("array_value"):
+                getattr(ws, field).data.extend(value)
+            else:
+                setattr(ws, field, value)
+        return msg
+
+    async def run(self, changes=None, fragment=False, timeout=120):
+        """
+        Reruns the script, optionally after setting widgets by label ({label: value}).
+        With fragment=True the rerun is scoped to the fragment owning the changed widgets, as the
+        browser does for widgets inside @st.fragment.
+        """
+        fragment_id = None
+        for label, value in (changes or {}).items():
+            widget = self.widgets[label]
+            self.values[widget.id] = (widget.kind, list(value) if isinstance(value, (list, tuple)) else value)
+            fragment_id = widget.fragment_id or fragment_id
+
+        start = time.perf_counter()
+        await self._ws.write_message(self._client_state(fragment_id if fragment else None).SerializeToString(),
+                                     binary=True)
+        received = messages = elements = 0
+        while True:
+            payload = await asyncio.wait_for(self._ws.read_message(), timeout)
+            if payload is None:
+                raise ConnectionError("websocket closed by server")
+            received += len(payload)
+            messages += 1
+            msg = ForwardMsg()
+            msg.ParseFromString(payload)
+            if msg.metadata.cacheable:
+                self._cached_hashes.add(msg.hash)
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                elements += 1
+                self._register(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == "script_finished":
+                status = ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)
+                if status != "FINISHED_EARLY_FOR_RERUN":
+                    return RunStats(time.perf_counter() - start, received, messages, elements, status)
+
+    def _register(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind in WIDGET_VALUE_FIELDS:
+            proto = getattr(element, kind)
+            options = list(proto.options) if hasattr(proto, "options") else []
+            self.widgets[proto.label] = Widget(kind, proto.id, proto.label, fragment_id, options)
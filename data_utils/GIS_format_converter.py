@@ -1,24 +1,67 @@
-import geopandas as gpd
-import pandas as pd
-from shapely.geometry import Point
+import time
 from pathlib import Path
 import duckdb
 
 def csv_to_geojson(filepath,outpath):
+    # geopandas/pandas are only needed here and in the non-streaming csv_to_parquet;
+    # importing them lazily keeps the streaming/upload path (ingest workers) light
+    import geopandas as gpd
+    import pandas as pd
     df = pd.read_csv(filepath, encoding="ISO-8859-1")
     df = df.dropna(subset=['Latitude', 'Longitude'])
-    df = df.dropna(subset=['Latitude', 'Longitude'])
 
-    df = gpd.GeoDataFrame(df, geometry=[Point(xy) for xy in zip(df['Longitude'], df['Latitude'])],
+    # Vectorized point construction (no per-row shapely Point)
+    df = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df['Longitude'], df['Latitude']),
                                crs="EPSG:4326")
     df.to_file(outpath, driver="GeoJSON")
 
 
-def csv_to_parquet(csv_filepath, parquet_outpath):
+def csv_to_parquet_streaming(csv_filepath, parquet_outpath, row_group_size=100_000, memory_limit="1GB",
+                             filters=None):
+    """
+    Streaming CSV -> Parquet conversion in bounded memory.
+    DuckDB reads the CSV in chunks, coerces Latitude/Longitude to DOUBLE (unparseable values
+    become NULL and are dropped) and writes row groups incrementally. Returns the row count.
+    filters = {column: value} keeps only rows where each column equals its value.
+    Note: DuckDB trims whitespace in header names (e.g. "Country " -> "Country").
+    """
+    filters = filters or {}
+    conditions = "".join(f' AND "{column}" = ?' for column in filters)
+    start = time.perf_counter()
+    con = duckdb.connect()
+    try:
+        con.execute(f"SET memory_limit = '{memory_limit}'")
+        rows = con.execute(f"""
+            COPY (
+                SELECT * REPLACE (
+                    TRY_CAST(Latitude AS DOUBLE) AS Latitude,
+                    TRY_CAST(Longitude AS DOUBLE) AS Longitude
+                )
+                FROM read_csv(?, encoding = 'latin-1', sample_size = -1)
+                WHERE TRY_CAST(Latitude AS DOUBLE) IS NOT NULL AND TRY_CAST(Longitude AS DOUBLE) IS NOT NULL
+                {conditions}
+            ) TO '{Path(parquet_outpath).as_posix()}' (FORMAT parquet, ROW_GROUP_SIZE {int(row_group_size)})
+        """, [str(csv_filepath), *filters.values()]).fetchone()[0]
+    finally:
+        con.close()
+
+    elapsed = time.perf_counter() - start
+    size_mb = Path(csv_filepath).stat().st_size / 1e6
+    print(f"Created Parquet file: {parquet_outpath} ({rows:,} rows in {elapsed:.1f}s; "
+          f"{rows / max(elapsed, 1e-9):,.0f} rows/s, {size_mb / max(elapsed, 1e-9):.1f} MB/s)")
+    return rows
+
+
+def csv_to_parquet(csv_filepath, parquet_outpath, streaming=False):
     """
     Converts CSV to Parquet while cleaning coordinates.
-    Best for MotherDuck uploads.
+    Best for MotherDuck uploads. Use streaming=True for files that don't fit in memory.
     """
+    if streaming:
+        csv_to_parquet_streaming(csv_filepath, parquet_outpath)
+        return parquet_outpath
+
+    import pandas as pd
     # Load with your specific encoding
     df = pd.read_csv(csv_filepath, encoding="ISO-8859-1")
 
@@ -32,17 +75,153 @@ def csv_to_parquet(csv_filepath, parquet_outpath):
     return parquet_outpath
 
 
-def upload_parquet_to_motherduck(parquet_path, table_name):
+def ensure_version_table(con):
+    """
+    Creates main._table_versions if missing. Runs outside any transaction: concurrent uploads
+    creating it inside their transactions would conflict (the ingest pipeline calls it once up front).
+    """
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS main._table_versions (
+            table_name VARCHAR PRIMARY KEY, version BIGINT, row_count BIGINT, updated_at TIMESTAMP
+        )
+    """)
+
+
+def _record_table_version(con, table_name, row_count):
+    """Bumps main._table_versions for table_name; the dashboard compares it to skip unchanged layers."""
+    con.execute("""
+        INSERT INTO main._table_versions VALUES (?, 1, ?, now())
+        ON CONFLICT (table_name) DO UPDATE
+        SET version = version + 1, row_count = EXCLUDED.row_count, updated_at = now()
+    """, [table_name, row_count])
+    return con.execute("SELECT version FROM main._table_versions WHERE table_name = ?", [table_name]).fetchone()[0]
+
+
+def _sync_parquet_incremental(con, abs_path, table_name, key_columns=None):
+    """
+    Applies the difference between a Parquet file and main.<table_name> in one transaction.
+    Rows are matched on key_columns (changed rows are updated; NULL keys are rejected) or,
+    without keys, on their content hash and occurrence number, so a change in the number of
+    duplicate rows is applied too (changed rows become delete + insert).
+    The table keeps a `_row_hash` column for this; the dashboard leaves it out when reading layers.
+    Returns {'inserted', 'updated', 'deleted', 'version'}.
+    """
+    target = f"main.{table_name}"
+    if key_columns:
+        null_keys = " OR ".join(f'"{k}" IS NULL' for k in key_columns)
+        missing = con.execute(f"SELECT count(*) FROM read_parquet('{abs_path}') WHERE {null_keys}").fetchone()[0]
+        if missing:
+            raise ValueError(f"{missing} rows of {abs_path} have NULL key columns {key_columns}; "
+                             f"they cannot be matched on later syncs")
+
+    src_columns = [r[0] for r in con.execute(f"DESCRIBE SELECT * FROM read_parquet('{abs_path}')").fetchall()]
+    existing = con.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = 'main' AND table_name = ? "
+        "ORDER BY ordinal_position", [table_name]
+    ).fetchall()
+    existing = [r[0] for r in existing]
+
+    # First sync, or schema changed: rebuild the table with its row-hash column
+    if existing != src_columns + ["_row_hash"]:
+        con.execute("BEGIN TRANSACTION")
+        con.execute(f"CREATE OR REPLACE TABLE {target} AS "
+                    f"SELECT *, md5(CAST(s AS VARCHAR)) AS _row_hash FROM read_parquet('{abs_path}') s")
+        rows = con.execute(f"SELECT count(*) FROM {target}").fetchone()[0]
+        version = _record_table_version(con, table_name, rows)
+        con.execute("COMMIT")
+        return {"inserted": rows, "updated": 0, "deleted": 0, "version": version, "rebuilt": True}
+
+    # Diff computed locally: only key columns + hashes are read from the remote table
+    con.execute(f"CREATE OR REPLACE TEMP TABLE _sync_src AS "
+                f"SELECT *, md5(CAST(s AS VARCHAR)) AS _row_hash FROM read_parquet('{abs_path}') s")
+    if key_columns:
+        keys = [f'"{k}"' for k in key_columns]
+        on = " AND ".join(f"s.{k} = r.{k}" for k in keys)
+        con.execute(f"CREATE OR REPLACE TEMP TABLE _sync_remote AS "
+                    f"SELECT {', '.join(dict.fromkeys(keys + ['_row_hash']))} FROM {target}")
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE _sync_delta AS
+            SELECT s.*, CASE WHEN r._row_hash IS NULL THEN 'insert' ELSE 'update' END AS _op
+            FROM _sync_src s LEFT JOIN _sync_remote r ON {on}
+            WHERE r._row_hash IS NULL OR r._row_hash <> s._row_hash
+        """)
+        con.execute(f"CREATE OR REPLACE TEMP TABLE _sync_deleted AS "
+                    f"SELECT r.* FROM _sync_remote r ANTI JOIN _sync_src s ON {on}")
+    else:
+        # Exact duplicates: the n-th copy of a hash matches only the n-th copy on the other side
+        copies = "row_number() OVER (PARTITION BY _row_hash) AS _copy"
+        con.execute(f"CREATE OR REPLACE TEMP TABLE _sync_remote AS SELECT _row_hash, {copies} FROM {target}")
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE _sync_delta AS
+            SELECT s.* EXCLUDE (_copy), 'insert' AS _op
+            FROM (SELECT *, {copies} FROM _sync_src) s ANTI JOIN _sync_remote r USING (_row_hash, _copy)
+        """)
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE _sync_deleted AS
+            SELECT r.* FROM _sync_remote r
+            ANTI JOIN (SELECT _row_hash, {copies} FROM _sync_src) s USING (_row_hash, _copy)
+        """)
+    inserted, updated = con.execute(
+        "SELECT count(*) FILTER (_op = 'insert'), count(*) FILTER (_op = 'update') FROM _sync_delta"
+    ).fetchone()
+    deleted = con.execute("SELECT count(*) FROM _sync_deleted").fetchone()[0]
+
+    version = None
+    if inserted or updated or deleted:
+        con.execute("BEGIN TRANSACTION")
+        if key_columns:
+            match = " AND ".join(f"t.{k} = d.{k}" for k in keys)
+            con.execute(f"DELETE FROM {target} t WHERE EXISTS (SELECT 1 FROM _sync_deleted d WHERE {match})")
+            con.execute(f"DELETE FROM {target} t WHERE EXISTS "
+                        f"(SELECT 1 FROM _sync_delta d WHERE d._op = 'update' AND {match})")
+            con.execute(f"INSERT INTO {target} BY NAME SELECT * EXCLUDE (_op) FROM _sync_delta")
+        else:
+            # Copies of one hash are indistinguishable: rewrite every copy of each changed hash
+            changed = "SELECT _row_hash FROM _sync_delta UNION SELECT _row_hash FROM _sync_deleted"
+            con.execute(f"DELETE FROM {target} WHERE _row_hash IN ({changed})")
+            con.execute(f"INSERT INTO {target} BY NAME SELECT * FROM _sync_src WHERE _row_hash IN ({changed})")
+        rows = con.execute(f"SELECT count(*) FROM {target}").fetchone()[0]
+        version = _record_table_version(con, table_name, rows)
+        con.execute("COMMIT")
+
+    for temp in ("_sync_src", "_sync_remote", "_sync_delta", "_sync_deleted"):
+        con.execute(f"DROP TABLE IF EXISTS {temp}")
+    return {"inserted": inserted, "updated": updated, "deleted": deleted, "version": version, "rebuilt": False}
+
+
+def upload_parquet_to_motherduck(parquet_path, table_name, incremental=False, key_columns=None,
+                                 database="md:my_db"):
     """
     Uploads a Parquet file to MotherDuck.
     Much faster and more reliable than CSV.
+
+    incremental=True syncs only changed rows (see _sync_parquet_incremental) instead of
+    replacing the table, keyed on key_columns or on a per-row content hash.
+    Returns the sync stats, or None if the upload failed.
     """
     abs_path = str(Path(parquet_path).resolve())
-    con = duckdb.connect("md:my_db")
+    con = duckdb.connect(database)
 
     try:
+        ensure_version_table(con)
+        if incremental:
+            stats = _sync_parquet_incremental(con, abs_path, table_name, key_columns=key_columns)
+            print(f"Synced {table_name}: +{stats['inserted']} ~{stats['updated']} -{stats['deleted']} "
+                  f"(version {stats['version'] or 'unchanged'})")
+            return stats
+
         # No 'sniffing' needed for Parquet!
         con.execute(f"CREATE OR REPLACE TABLE main.{table_name} AS SELECT * FROM '{abs_path}'")
+        rows = con.execute(f"SELECT count(*) FROM main.{table_name}").fetchone()[0]
+        version = _record_table_version(con, table_name, rows)
         print(f"Successfully uploaded {table_name} to MotherDuck via Parquet.")
+        return {"inserted": rows, "updated": 0, "deleted": 0, "version": version, "rebuilt": True}
     except Exception as e:
-        print(f"Parquet Upload Error: {e}")
\ No newline at end of file
+        if incremental:
+            try:
+                con.execute("ROLLBACK")
+            except Exception:
+                pass
+        print(f"Parquet Upload Error: {e}")
+    finally:
+        con.close()
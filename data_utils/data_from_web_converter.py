@@ -1,53 +1,149 @@
-import requests
 import re, json
 import pandas as pd
-from datetime import datetime
+from data_utils.web_client import get_client
+
+
+def _flourish_id_from_page(content):
+    # Pattern 1: Direct visualization link (common in iframes)
+    # matches: flourish.studio/visualisation/1234567
+    # matches: flo.uri.sh/visualisation/1234567
+    viz_match = re.search(r"visualisation/(\d+)", content)
+
+    # Pattern 2: Story link (stories are collections of visualizations)
+    # matches: flourish.studio/story/1234567
+    story_match = re.search(r"story/(\d+)", content)
+
+    if viz_match:
+        print(f"✅ Found Visualization ID: {viz_match.group(1)}")
+        return viz_match.group(1)
+    elif story_match:
+        print(f"⚠️ Found Story ID: {story_match.group(1)} (Stories require different handling)")
+        return story_match.group(1)
+    else:
+        # Fallback: Look for data-src attributes which often hold the ID
+        data_src_match = re.search(r"data-src=[\"'](https://flo\.uri\.sh/visualisation/(\d+)/embed)[\"']", content)
+        if data_src_match:
+            print(f"✅ Found Data-Src ID: {data_src_match.group(2)}")
+            return data_src_match.group(2)
+
+        print("❌ No Flourish ID found in the page source.")
+        return None
 
 
-def find_flourish_id(url):
+def find_flourish_id(url, client=None):
     print(f"🔎 Scanning: {url}")
 
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        content = response.text
-
-        # Pattern 1: Direct visualization link (common in iframes)
-        # matches: flourish.studio/visualisation/1234567
-        # matches: flo.uri.sh/visualisation/1234567
-        viz_match = re.search(r"visualisation/(\d+)", content)
-
-        # Pattern 2: Story link (stories are collections of visualizations)
-        # matches: flourish.studio/story/1234567
-        story_match = re.search(r"story/(\d+)", content)
-
-        if viz_match:
-            print(f"✅ Found Visualization ID: {viz_match.group(1)}")
-            return viz_match.group(1)
-        elif story_match:
-            print(f"⚠️ Found Story ID: {story_match.group(1)} (Stories require different handling)")
-            return story_match.group(1)
+        content = (client or get_client()).get_text(url)
+        return _flourish_id_from_page(content)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None
+
+
+def find_flourish_ids(urls, client=None):
+    """Scans several source pages concurrently; returns {url: visualisation id or None}."""
+    pages = (client or get_client()).fetch_all(urls)
+    ids = {}
+    for url, content in pages.items():
+        print(f"🔎 Scanning: {url}")
+        if isinstance(content, Exception):
+            print(f"❌ Error: {content}")
+            ids[url] = None
         else:
-            # Fallback: Look for data-src attributes which often hold the ID
-            data_src_match = re.search(r"data-src=[\"'](https://flo\.uri\.sh/visualisation/(\d+)/embed)[\"']", content)
-            if data_src_match:
-                print(f"✅ Found Data-Src ID: {data_src_match.group(2)}")
-                return data_src_match.group(2)
+            ids[url] = _flourish_id_from_page(content)
+    return ids
 
-            print("❌ No Flourish ID found in the page source.")
-            return None
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
+# JavaScript `new Date(ms)` literals in value position (after `:`, `,` or `[`), rewritten to ms
+_FLOURISH_DATE = re.compile(r"(?<=[:,\[])(\s*)new Date\((-?\d+)\)")
+
+
+def decode_flourish_object(text, start=0):
+    """
+    Decodes the first JS object literal at/after `start`: `new Date(ms)` values become plain
+    numbers, then json's raw_decode parses exactly one object (no fixed-size window) and
+    ignores whatever follows it. Returns the parsed dict, or None.
+    """
+    start = text.find("{", start)
+    if start == -1:
+        print("❌ Could not find start of JSON object '{'")
         return None
 
-def dump_raw_flourish_text(visualisation_id, output_file_path):
+    try:
+        data, _ = json.JSONDecoder().raw_decode(_FLOURISH_DATE.sub(r"\1\2", text[start:]))
+        return data
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON Decode Error: {e}")
+        return None
+
+
+def extract_flourish_data(html_content):
+    """Decodes the `_Flourish_data = {...}` assignment from an embed page (see decode_flourish_object)."""
+    match = re.search(r"_Flourish_data\s*=\s*", html_content)
+    if not match:
+        print("Could not find '_Flourish_data' in the page source.")
+        return None
+    return decode_flourish_object(html_content, match.end())
+
+
+def flourish_points_to_frame(points):
+    """
+    Builds the output table column-wise from Flourish map points.
+    Metadata mapping: 0: Funding, 1: Color, 2: Agency Short, 3: Agency Full,
+    4: Institution, 5: Date (ms timestamp), 6: Focus Area, 7: Website
+    """
+    metas = [p.get("metadata") or [] for p in points]
+
+    def meta_column(idx):
+        return [m[idx] if len(m) > idx and m[idx] is not None else "" for m in metas]
+
+    # Vectorized date conversion: numeric ms timestamps -> YYYY-MM-DD (UTC), anything else -> ""
+    raw_dates = pd.Series(meta_column(5), dtype=object)
+    numeric = raw_dates.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool))
+    dates = pd.to_datetime(raw_dates.where(numeric).astype("float64"), unit="ms", errors="coerce")
+    founding = dates.dt.strftime("%Y-%m-%d").where(dates.notna(), raw_dates.where(numeric).astype(str))
+    founding = founding.where(numeric, "")
+
+    df = pd.DataFrame({
+        "Name": [p.get("label", "N/A") for p in points],
+        "Institution": meta_column(4),
+        "Agency": meta_column(2),  # Prefer metadata agency over point color
+        "Focus Area": meta_column(6),
+        "Founding Date": founding.tolist(),
+        "Funding": meta_column(0),
+        "Latitude": [p.get("lat") for p in points],
+        "Longitude": [p.get("lon") for p in points],
+        "Website": meta_column(7),
+        "Agency Full": meta_column(3),
+    })
+    return df
+
+
+def fetch_flourish_html(visualisation_id, client=None):
     url = f"https://flo.uri.sh/visualisation/{visualisation_id}/embed"
     print(f"Fetching raw HTML from: {url}")
+    return (client or get_client()).get_text(url)
+
+
+def export_flourish(visualisation_id, output_file_path):
+    """In-memory pipeline: embed page -> decoded points -> CSV, without an intermediate raw file."""
+    data = extract_flourish_data(fetch_flourish_html(visualisation_id))
+    if data is None:
+        return None
+    if "points" not in data:
+        print("❌ Could not find 'points' list in the data.")
+        return None
+
+    print(f"📊 Processing {len(data['points'])} data points...")
+    df = flourish_points_to_frame(data["points"])
+    df.to_csv(output_file_path, index=False, encoding='utf-8-sig')
+    print(f"🎉 Success! Saved to: {output_file_path}")
+    return df
+
 
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-    html_content = response.text
+def dump_raw_flourish_text(visualisation_id, output_file_path):
+    html_content = fetch_flourish_html(visualisation_id)
 
     # Find where the variable assignment starts
     # We look for "_Flourish_data ="
@@ -59,20 +155,14 @@ def dump_raw_flourish_text(visualisation_id, output_file_path):
 
     print("Found data start point. Extracting raw text chunk...")
 
-    # Start capturing right after "_Flourish_data ="
+    # Start capturing right after "_Flourish_data =" and stop at the end of the object
+    # (or at the next script tag), so large visualisations are no longer truncated
     start_index = match.end()
-
-    # We will grab a large chunk (e.g., 500,000 characters) to ensure we get everything.
-    # We assume the data ends with a semicolon usually, but we'll grab extra to be safe.
-    raw_chunk = html_content[start_index: start_index + 500000]
-
-    # OPTIONAL: precise slicing
-    # Try to cut it off at the next script tag if possible to keep it cleaner
+    raw_chunk = html_content[start_index:]
     if "</script>" in raw_chunk:
         raw_chunk = raw_chunk.split("</script>")[0]
 
     # Save to a text file
-    filename = output_file_path
     with open(output_file_path, "w", encoding="utf-8") as f:
         f.write(raw_chunk)
 
@@ -81,103 +171,26 @@ def dump_raw_flourish_text(visualisation_id, output_file_path):
 
 
 def decode_and_export_flourish(input_file_path,output_file_path):
+    """Decodes a raw dump written by dump_raw_flourish_text and saves the points as CSV."""
     print(f"📂 Reading raw file: {input_file_path}")
 
     with open(input_file_path, 'r', encoding='utf-8') as f:
         raw_text = f.read()
 
-    # --- Step 1: Clean JavaScript Syntax ---
-    # Replace "new Date(123456789)" with just the number "123456789"
-    # This makes it valid for the JSON parser
-    clean_text = re.sub(r'new Date\((-?\d+)\)', r'\1', raw_text)
-
-    # --- Step 2: Robust Parsing ---
-    # Find the very first '{' which starts the data object
-    start_index = clean_text.find('{')
-
-    if start_index == -1:
-        print("❌ Could not find start of JSON object '{'")
-        return
-
-    try:
-        # raw_decode parses one valid JSON object and ignores the rest of the string
-        decoder = json.JSONDecoder()
-        data, _ = decoder.raw_decode(clean_text[start_index:])
-        print("✅ JSON parsed successfully!")
-
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON Decode Error: {e}")
+    data = decode_flourish_object(raw_text)
+    if data is None:
         return
+    print("✅ JSON parsed successfully!")
 
-    # --- Step 3: Extract Data ---
     if "points" not in data:
         print("❌ Could not find 'points' list in the data.")
         return
 
     points = data["points"]
     print(f"📊 Processing {len(points)} data points...")
-
-    extracted_rows = []
-
-    for p in points:
-        # Basic Info
-        name = p.get("label", "N/A")
-        lat = p.get("lat")
-        lon = p.get("lon")
-
-        # Metadata mapping based on your file structure:
-        # 0: Funding, 1: Color, 2: Agency Short, 3: Agency Full,
-        # 4: Institution, 5: Date, 6: Focus Area, 7: Website
-        meta = p.get("metadata", [])
-
-        # Helper to get metadata safely
-        def get_meta(idx):
-            return meta[idx] if meta and len(meta) > idx and meta[idx] is not None else ""
-
-        funding = get_meta(0)
-        agency_short = get_meta(2)  # Prefer metadata agency over point color
-        agency_full = get_meta(3)
-        institution = get_meta(4)
-        focus_area = get_meta(6)
-        website = get_meta(7)
-
-        # Date Parsing (Handle timestamps from the Regex fix)
-        raw_date = get_meta(5)
-        founding_date = ""
-        if isinstance(raw_date, (int, float)):
-            try:
-                # Timestamps usually ms
-                dt = datetime.fromtimestamp(raw_date / 1000)
-                founding_date = dt.strftime('%Y-%m-%d')
-            except:
-                founding_date = str(raw_date)
-
-        extracted_rows.append({
-            "Name": name,
-            "Institution": institution,
-            "Agency": agency_short,
-            "Agency Full": agency_full,
-            "Focus Area": focus_area,
-            "Funding": funding,
-            "Founding Date": founding_date,
-            "Latitude": lat,
-            "Longitude": lon,
-            "Website": website
-        })
-
-    # --- Step 4: Save to CSV ---
-    df = pd.DataFrame(extracted_rows)
-
-    # Reorder columns nicely
-    cols = ["Name", "Institution", "Agency", "Focus Area", "Founding Date",
-            "Funding", "Latitude", "Longitude", "Website", "Agency Full"]
-    # Filter to only columns that exist
-    df = df[[c for c in cols if c in df.columns]]
+    df = flourish_points_to_frame(points)
 
     df.to_csv(output_file_path, index=False, encoding='utf-8-sig')
 
     print(f"🎉 Success! Saved to: {output_file_path}")
     print(df.head())
-
-
-
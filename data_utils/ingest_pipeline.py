@@ -0,0 +1,165 @@
+# File: data_utils/ingest_pipeline.py
+"""
+Manifest-driven ingest: CSV -> Parquet -> MotherDuck for every dataset, in parallel processes.
+
+    python -m data_utils.ingest_pipeline [data_utils/ingest_manifest.yaml] [--workers 4] [--force]
+
+Each stage is skipped when the hash of its inputs (file content + stage settings) matches
+the checkpoint recorded in <data_dir>/.ingest_state.json by the last successful run.
+"""
+import argparse, hashlib, json, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_MANIFEST = Path(__file__).parent / "ingest_manifest.yaml"
+STATE_FILE = ".ingest_state.json"
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _stage_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def load_manifest(path, data_dir=None, database=None):
+    """Reads the manifest and resolves dataset paths against data_dir."""
+    manifest = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+    base = Path(data_dir or os.getenv("QUANTUM_DATA_DIR") or manifest.get("data_dir", "data_map"))
+    if not base.is_absolute():
+        base = PROJECT_ROOT / base
+
+    datasets = []
+    for name, spec in (manifest.get("datasets") or {}).items():
+        source = base / spec["source"]
+        datasets.append({
+            "name": name,
+            "source": source,
+            "output": base / spec["output"] if spec.get("output") else source.with_suffix(".parquet"),
+            "filters": spec.get("filters") or {},
+            "upload": spec.get("upload", True),
+            "table": spec.get("table", name),
+            "incremental": spec.get("incremental", True),
+            "key_columns": spec.get("key_columns"),
+        })
+    return base, database or manifest.get("database", "md:my_db"), datasets
+
+
+def run_dataset(dataset, database, checkpoints, force=False):
+    """
+    Runs convert + upload for one dataset (in a worker process).
+    Returns (name, {stage: seconds or 'skipped'} plus 'error' if the upload failed, updated checkpoints).
+    """
+    from data_utils.GIS_format_converter import csv_to_parquet_streaming, upload_parquet_to_motherduck
+
+    timings, checkpoints = {}, dict(checkpoints)
+
+    start = time.perf_counter()
+    convert_key = _stage_key(_file_hash(dataset["source"]), dataset["filters"], str(dataset["output"]))
+    timings["hash"] = time.perf_counter() - start
+
+    if not force and checkpoints.get("convert") == convert_key and dataset["output"].exists():
+        timings["convert"] = "skipped"
+    else:
+        start = time.perf_counter()
+        csv_to_parquet_streaming(dataset["source"], dataset["output"], filters=dataset["filters"])
+        timings["convert"] = time.perf_counter() - start
+        checkpoints["convert"] = convert_key
+
+    if dataset["upload"]:
+        upload_key = _stage_key(_file_hash(dataset["output"]), dataset["table"], database,
+                                dataset["incremental"], dataset["key_columns"])
+        if not force and checkpoints.get("upload") == upload_key:
+            timings["upload"] = "skipped"
+        else:
+            start = time.perf_counter()
+            result = upload_parquet_to_motherduck(dataset["output"], dataset["table"],
+                                                  incremental=dataset["incremental"],
+                                                  key_columns=dataset["key_columns"], database=database)
+            # upload_parquet_to_motherduck reports errors instead of raising; only checkpoint real syncs
+            if result is None:
+                timings["error"] = f"upload to {dataset['table']} failed (see 'Parquet Upload Error' above)"
+            else:
+                timings["upload"] = time.perf_counter() - start
+                checkpoints["upload"] = upload_key
+
+    return dataset["name"], timings, checkpoints
+
+
+def _prepare_database(database):
+    """Creates the shared version table once, before parallel uploads would race to create it."""
+    import duckdb
+    from data_utils.GIS_format_converter import ensure_version_table
+    con = duckdb.connect(database)
+    try:
+        ensure_version_table(con)
+    finally:
+        con.close()
+
+
+def run_pipeline(manifest_path=DEFAULT_MANIFEST, workers=None, force=False, data_dir=None, database=None):
+    """Runs every dataset in the manifest; returns {dataset: {stage: seconds or 'skipped'}}."""
+    base, database, datasets = load_manifest(manifest_path, data_dir=data_dir, database=database)
+    state_path = base / STATE_FILE
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+
+    if any(dataset["upload"] for dataset in datasets):
+        _prepare_database(database)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_dataset, dataset, database, state.get(dataset["name"], {}), force): dataset["name"]
+            for dataset in datasets
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                name, timings, checkpoints = future.result()
+            except Exception as e:
+                print(f"❌ {name}: {e}")
+                results[name] = {"error": str(e)}
+                continue
+            results[name] = timings
+            state[name] = checkpoints
+            # Persist after every dataset so a later failure doesn't lose finished work
+            tmp = state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, indent=2))
+            os.replace(tmp, state_path)
+
+    _print_timings(results)
+    return results
+
+
+def _print_timings(results):
+    stages = ["hash", "convert", "upload"]
+    print(f"{'dataset':<28}" + "".join(f"{s:>12}" for s in stages))
+    for name, timings in sorted(results.items()):
+        if "error" in timings:
+            print(f"{name:<28}  error: {timings['error']}")
+            continue
+        cells = []
+        for stage in stages:
+            value = timings.get(stage, "-")
+            cells.append(f"{value:>11.2f}s" if isinstance(value, float) else f"{value:>12}")
+        print(f"{name:<28}" + "".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("manifest", nargs="?", default=DEFAULT_MANIFEST)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="ignore checkpoints and rerun every stage")
+    parser.add_argument("--data-dir", default=None, help="overrides data_dir from the manifest")
+    parser.add_argument("--database", default=None, help="overrides the target database (a local .duckdb file needs --workers 1)")
+    args = parser.parse_args(argv)
+    run_pipeline(args.manifest, workers=args.workers, force=args.force,
+                 data_dir=args.data_dir, database=args.database)
+
+
+if __name__ == "__main__":
+    main()
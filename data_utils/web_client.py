@@ -0,0 +1,122 @@
+# File: data_utils/web_client.py
+import hashlib, json, os, threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_CACHE_DIR = Path(os.getenv("QUANTUM_HTTP_CACHE", Path(__file__).parent.parent / ".http_cache"))
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+
+class CachedHttpClient:
+    """
+    HTTP client for the scrapers.
+
+    - one pooled requests.Session per thread, with retry + exponential backoff on
+      connection errors and 429/5xx responses
+    - conditional GETs (If-None-Match / If-Modified-Since) backed by an on-disk cache,
+      so unchanged pages cost a 304 instead of a full download
+    - bounded concurrency for fetching several URLs (fetch_all)
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_workers=4, timeout=30, retries=3, backoff=0.5,
+                 headers=None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            retry = Retry(total=self.retries, backoff_factor=self.backoff,
+                          status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+            adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.max_workers)
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def _cache_paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def _read_cache(self, url):
+        if not self.cache_dir:
+            return None, None
+        meta_path, body_path = self._cache_paths(url)
+        if not (meta_path.exists() and body_path.exists()):
+            return None, None
+        return json.loads(meta_path.read_text(encoding="utf-8")), body_path.read_bytes()
+
+    def _write_cache(self, url, response):
+        if not self.cache_dir:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._cache_paths(url)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "encoding": response.encoding,
+        }
+        tmp = body_path.with_suffix(f".tmp{threading.get_ident()}")
+        tmp.write_bytes(response.content)
+        os.replace(tmp, body_path)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    def get_text(self, url):
+        """Returns the page text, revalidating any cached copy; falls back to the cache if the fetch fails."""
+        meta, body = self._read_cache(url)
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and body is not None:
+                return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if body is None:
+                raise
+            print(f"⚠️ Fetch failed for {url} ({e}); using cached copy")
+            return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+
+        self._write_cache(url, response)
+        return response.text
+
+    def fetch_all(self, urls):
+        """Fetches several URLs with at most max_workers in flight; returns {url: text or exception}."""
+        def fetch(url):
+            try:
+                return self.get_text(url)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(urls, pool.map(fetch, urls)))
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the shared client used by the scraping helpers."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = CachedHttpClient()
+        return _default_client
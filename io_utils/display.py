@@ -1,8 +1,9 @@
 # File: src_streamlit/io_utils/display.py
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
+from plotly.colors import qualitative
+from src_streamlit.data_cache import cached, cache_size
+from src_streamlit.metrics import instrument, metrics_snapshot, prometheus_text
 
 
 def show_header_text(content):
@@ -12,76 +13,186 @@ def show_header_text(content):
         st.markdown(content['intro_markdown'])
 
 
+@cached(ttl=float("inf"), max_entries=256)
+def _resource_bar_figure(label, unit, scenarios, values, errors):
+    """
+    Builds one log-scale bar chart, memoized on its inputs. The memo saves building and validating
+    the figure (~2 ms per chart); st.plotly_chart still serializes it to JSON on every run of the
+    chart fragment (~0.3 ms per chart), as it accepts no pre-serialized spec.
+    """
+    # graph_objects instead of plotly.express: same chart without importing px/pandas at startup
+    fig = go.Figure(go.Bar(
+        x=list(scenarios), y=list(values), error_y=dict(type='data', array=list(errors)),
+        marker_color=qualitative.Pastel[0]
+    ))
+    fig.update_layout(height=260, margin=dict(l=20, r=20, t=30, b=20), showlegend=False,
+                      xaxis_title='Scenario', yaxis_title=f"{label} ({unit})")
+    fig.update_yaxes(type="log", autorange=True)
+    return fig
+
+
+@instrument(measure=None)
 def show_resource_bar_charts(RESOURCES, SCENARIOS, chart_data, selected_scale, labels, units):
-    """Generates the vertical stack of log-scale bar charts."""
+    """
+    Generates the vertical stack of log-scale bar charts.
+    chart_data is the (scenario, scale, resource)-indexed table from get_barchart_table().
+    """
+    if not SCENARIOS:
+        return
+    import pandas as pd  # already loaded by get_barchart_table(); kept out of module import time
+
+    # One vectorized lookup for every (scenario, resource) at the FTQC scale selected in sidebar
+    index = pd.MultiIndex.from_product([SCENARIOS, [selected_scale], RESOURCES])
+    subset = chart_data.reindex(index, fill_value=0.0)
+
     for resource in RESOURCES:
         label = labels.get(resource, resource)
         unit = units.get(resource, "")
-        rows = []
-
-        for scenario in SCENARIOS:
-            entries = chart_data.get(scenario, [])
-            # Filter by the FTQC scale selected in sidebar
-            subset = [e for e in entries if e.get("scale") == selected_scale]
-            val = sum(e.get(resource, 0) for e in subset)
-            err = (sum(e.get(f"{resource}Err", 0) ** 2 for e in subset)) ** 0.5
-            rows.append({"scenario": scenario, "value": val, "error": err})
-
-        df = pd.DataFrame(rows)
-        if not df.empty:
-            st.markdown(f"**{label}**")
-            fig = px.bar(
-                df, x='scenario', y='value', error_y='error',
-                labels={'scenario': 'Scenario', 'value': f"{label} ({unit})"},
-                color_discrete_sequence=[px.colors.qualitative.Pastel[0]]
-            )
-            fig.update_layout(height=260, margin=dict(l=20, r=20, t=30, b=20), showlegend=False)
-            fig.update_yaxes(type="log", autorange=True)
-            st.plotly_chart(fig, use_container_width=True)
-
-
-def show_geographic_map(selected_layers, map_layers_data, style_config):
-    """Renders the Mapbox visualization."""
+        rows = subset.xs(resource, level=2)
+
+        st.markdown(f"**{label}**")
+        fig = _resource_bar_figure(label, unit, tuple(SCENARIOS),
+                                   tuple(rows["value"].tolist()), tuple(rows["error"].tolist()))
+        st.plotly_chart(fig, width="stretch")
+
+
+def _map_points(result, selected_layers, map_layers_data, *args, **kwargs):
+    """(rows, bytes) recorded for a map render: markers drawn and the size of their arrays."""
+    layers = [map_layers_data[n] for n in selected_layers if map_layers_data.get(n) is not None]
+    return sum(len(layer) for layer in layers), sum(layer.nbytes for layer in layers)
+
+
+def _compact(values):
+    """float32 copy for the browser: Plotly ships numeric arrays as base64 typed arrays, so this halves
+    their payload (~1 m precision for coordinates)."""
+    import numpy as np
+    return np.asarray(values, dtype=np.float32)
+
+
+def show_sensitivity_chart(sweep, current, parameter, labels):
+    """Each resource along one swept input, relative to the custom scenario (log-log)."""
+    if sweep is None or sweep.empty:
+        return
     fig = go.Figure()
+    for resource in sweep.columns:
+        base = sweep.at[current, resource]
+        fig.add_trace(go.Scatter(x=sweep.index, y=sweep[resource] / base if base else sweep[resource],
+                                 mode='lines', name=labels.get(resource, resource)))
+    fig.update_layout(xaxis_title=parameter.replace('_', ' '), yaxis_title="x custom scenario",
+                      height=300, margin={"r": 0, "t": 10, "l": 0, "b": 0})
+    fig.update_xaxes(type="log")
+    fig.update_yaxes(type="log")
+    st.plotly_chart(fig, width="stretch")
+
+
+def _link_trace(pairs):
+    """One line trace joining each source site to its nearest targets (segments split by None)."""
+    lat, lon, text = [], [], []
+    for row in pairs.itertuples(index=False):
+        lat += [row.source_lat, row.target_lat, None]
+        lon += [row.source_lon, row.target_lon, None]
+        label = f"{row.source} → {row.target}: {row.distance_km:,.1f} km"
+        text += [label, label, None]
+    return go.Scattermapbox(lat=lat, lon=lon, mode='lines', line=dict(width=1, color='#2A2A2A'),
+                            text=text, hoverinfo='text', name="Nearest data centers")
+
+
+def _geographic_figure(selected_layers, map_layers_data, style_config, bounds, links=None):
+    """Builds the Mapbox figure for the selected layers (+ optional proximity links); None if there is no data."""
+    fig = go.Figure()
+    if links is not None and len(links):
+        fig.add_trace(_link_trace(links))
     defaults = style_config.get('defaults', {'color': 'red', 'size': 8, 'opacity': 0.7})
     layer_styles = style_config.get('layers', {})
 
     has_data = False
     for name in selected_layers:
-        points = map_layers_data.get(name, [])
-        if not points: continue
+        # PointLayer: columnar lat/lon arrays, passed to Plotly without a DataFrame rebuild
+        layer = map_layers_data.get(name)
+        if layer is None or len(layer) == 0: continue
 
         has_data = True
-        df = pd.DataFrame(points)
         style = layer_styles.get(name, {})
+        size = style.get('size', defaults['size'])
+        counts = layer.column('point_count')
+        if counts is not None:
+            # Clustered layer: scale marker size with the number of points it stands for
+            import numpy as np
+            size = _compact(size * (1 + np.log10(counts)))
 
         fig.add_trace(go.Scattermapbox(
-            lat=df['lat'], lon=df['lon'], mode='markers',
+            lat=_compact(layer.lat), lon=_compact(layer.lon), mode='markers',
             marker=go.scattermapbox.Marker(
-                size=style.get('size', defaults['size']),
+                size=size,
                 color=style.get('color', defaults['color']),
                 opacity=style.get('opacity', defaults['opacity'])
             ),
-            text=df.get('name', name), name=name
+            text=layer.column('name', name), name=name
         ))
 
-    if has_data:
-        fig.update_layout(
-            mapbox={
-                "style": "open-street-map",
-                "bounds": {
-                    "west": -135, "east": -60,
-                    "south": 20, "north": 55
-                },
-                "zoom": 1,
-                "center": {"lat": 38.0, "lon": -95.0},
+    if not has_data:
+        return None
+
+    fig.update_layout(
+        mapbox={
+            "style": "open-street-map",
+            "bounds": {
+                "west": bounds[0], "east": bounds[2],
+                "south": bounds[1], "north": bounds[3]
             },
-            margin={"r": 0, "t": 0, "l": 0, "b": 0},
-            height=300,
-            showlegend=True,
-            legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
-        )
+            "zoom": 1,
+            "center": {"lat": 38.0, "lon": -95.0},
+        },
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
+        height=300,
+        showlegend=True,
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+    )
+    return fig
+
 
+@instrument(measure=_map_points)
+def show_geographic_map(selected_layers, map_layers_data, style_config, bounds=(-135, 20, -60, 55), links=None):
+    """
+    Renders the Mapbox visualization; bounds = (west, south, east, north).
+    links: optional proximity pairs (see get_proximity) drawn as lines between sites.
+    """
+    fig = _geographic_figure(selected_layers, map_layers_data, style_config, bounds, links=links)
+    if fig is not None:
         st.plotly_chart(fig)
     else:
-        st.info("No layer data selected.")
\ No newline at end of file
+        st.info("No layer data selected.")
+
+
+def show_proximity_table(summary, title="Nearest commercial data centers"):
+    """Per-site proximity summary (nearest target, distances, sites within the radius)."""
+    if summary is None or summary.empty:
+        return
+    st.markdown(f"**{title}**")
+    st.dataframe(summary, hide_index=True, width="stretch")
+
+
+def show_metrics_panel(cache_stats):
+    """Sidebar panel with per-stage latency, row/byte counters and cache hit rates (admin only)."""
+    with st.sidebar.expander("Performance", expanded=False):
+        stages = metrics_snapshot()
+        if stages:
+            st.dataframe([
+                {"stage": name, "calls": s["count"], "errors": s["errors"],
+                 "p50 ms": round(s["p50"] * 1000, 1), "p95 ms": round(s["p95"] * 1000, 1),
+                 "max ms": round(s["max"] * 1000, 1), "rows": s["rows"], "MB": round(s["bytes"] / 1e6, 2)}
+                for name, s in stages.items() if s["p50"] is not None
+            ], hide_index=True)
+        else:
+            st.caption("No stage timings recorded yet.")
+
+        st.dataframe([
+            {"function": name, "hits": c["hits"], "misses": c["misses"], "entries": c["entries"],
+             "evictions": c["evictions"], "MB": round(c["bytes"] / 1e6, 2),
+             "hit rate": round(c["hits"] / max(c["hits"] + c["misses"], 1), 3)}
+            for name, c in sorted(cache_stats.items())
+        ], hide_index=True)
+        held, budget = cache_size()
+        st.caption(f"Loader cache: {held / 1e6:.1f} of {budget / 1e6:.0f} MB (DASHBOARD_CACHE_MAX_MB)")
+        st.download_button("Prometheus metrics", prometheus_text(), file_name="dashboard_metrics.prom",
+                           mime="text/plain")
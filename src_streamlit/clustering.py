@@ -0,0 +1,69 @@
+# File: src_streamlit/clustering.py
+import numpy as np
+from src_streamlit.point_layer import PointLayer
+
+# Screen radius (pixels) merged into one cluster; converted to degrees per zoom level
+CLUSTER_RADIUS_PX = 40
+
+
+def cell_size_degrees(zoom, radius_px=CLUSTER_RADIUS_PX):
+    """Grid cell size in degrees for a web-map zoom level (256px tiles)."""
+    return radius_px * 360.0 / (256 * 2 ** zoom)
+
+
+def cluster_points(layer, zoom, radius_px=CLUSTER_RADIUS_PX, aggregations=None):
+    """
+    Grid-bins a PointLayer for the given zoom level and returns one point per occupied cell.
+
+    Each cluster sits at the centroid of its members and carries a `point_count` column.
+    Numeric properties are aggregated per `aggregations` ({column: 'sum'|'mean'|'min'|'max'},
+    default 'sum'); `name` keeps the member's name for singletons and "N sites" otherwise.
+    """
+    n = len(layer)
+    if n == 0:
+        return layer
+
+    cell = cell_size_degrees(zoom, radius_px)
+    gx = np.floor(layer.lon / cell).astype("int64")
+    gy = np.floor(layer.lat / cell).astype("int64")
+    keys = (gx - gx.min()) * (int(gy.max() - gy.min()) + 1) + (gy - gy.min())
+    _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+
+    lat = np.bincount(inverse, weights=layer.lat) / counts
+    lon = np.bincount(inverse, weights=layer.lon) / counts
+    columns = {'point_count': counts}
+
+    aggregations = aggregations or {}
+    for name, values in layer.columns.items():
+        if name in ('Latitude', 'Longitude', 'point_count') or values.dtype.kind not in "fiu":
+            continue
+        how = aggregations.get(name, 'sum')
+        columns[name] = _aggregate(values.astype("float64"), inverse, counts, how)
+
+    names = layer.column('name')
+    labels = np.array([f"{c:,} sites" for c in counts.tolist()], dtype=object)
+    if names is not None:
+        single = counts == 1
+        labels[single] = names[first[single]]
+    columns['name'] = labels
+
+    return PointLayer(lat, lon, columns)
+
+
+def _aggregate(values, inverse, counts, how):
+    """Vectorized per-cluster aggregation that ignores NaN members."""
+    valid = ~np.isnan(values)
+    if how in ('sum', 'mean'):
+        total = np.bincount(inverse, weights=np.where(valid, values, 0.0), minlength=len(counts))
+        if how == 'sum':
+            return total
+        n_valid = np.bincount(inverse, weights=valid, minlength=len(counts))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return total / n_valid
+    if how in ('min', 'max'):
+        fill = np.inf if how == 'min' else -np.inf
+        out = np.full(len(counts), fill)
+        (np.minimum if how == 'min' else np.maximum).at(out, inverse, np.where(valid, values, fill))
+        out[np.isinf(out)] = np.nan
+        return out
+    raise ValueError(f"Unknown aggregation: {how}")
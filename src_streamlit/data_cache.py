@@ -0,0 +1,179 @@
+# File: src_streamlit/data_cache.py
+import os
+import sys
+import time
+import threading
+import functools
+from collections import OrderedDict
+from pathlib import Path
+
+# Default time-to-live (seconds) for cached loader results; override with DASHBOARD_CACHE_TTL
+DEFAULT_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", 600))
+# Memory budget (MB) for all cached values; least recently used entries are evicted beyond it
+MAX_CACHE_BYTES = float(os.getenv("DASHBOARD_CACHE_MAX_MB", 1024)) * 1e6
+
+_lock = threading.RLock()
+_entries = OrderedDict()  # (func name, args) -> (value, stored_at, fingerprint, nbytes); LRU first
+_stats = {}     # func name -> {"hits": int, "misses": int, "evictions": int}
+_key_locks = {}  # (func name, args) -> Lock held while the entry is being computed
+_total_bytes = 0
+
+
+def file_fingerprint(*paths):
+    """Returns a tuple of mtimes (ns) for the given paths; None for missing files."""
+    stamps = []
+    for p in paths:
+        try:
+            stamps.append(os.stat(Path(p)).st_mtime_ns)
+        except (OSError, TypeError):
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def sizeof(value, _depth=0):
+    """
+    Approximate private memory held by a cached value: `nbytes` for arrays, PointLayers and
+    spatial indexes (less pages mapped from snapshot files, which the OS shares between
+    processes; object arrays add the objects they point to), pandas' deep accounting for
+    frames, recursion into containers and Plotly figures, sys.getsizeof otherwise.
+    """
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        if getattr(value, "dtype", None) == object:
+            distinct = {id(v): v for v in value.ravel()}
+            nbytes += sum(map(sys.getsizeof, distinct.values()))
+        return nbytes - getattr(value, "mapped_nbytes", 0)
+    if callable(getattr(value, "to_plotly_json", None)):
+        return sizeof(value.to_plotly_json(), _depth)  # Plotly figures: their data and layout
+    if hasattr(value, "memory_usage") and hasattr(value, "index"):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if _depth < 6 and isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k, _depth + 1) + sizeof(v, _depth + 1) for k, v in value.items())
+    if _depth < 6 and isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(v, _depth + 1) for v in value)
+    return sys.getsizeof(value)
+
+
+def _drop(key):
+    """Removes one entry and its size from the accounting; caller holds _lock."""
+    global _total_bytes
+    entry = _entries.pop(key, None)
+    if entry is not None:
+        _total_bytes -= entry[3]
+
+
+def _evict(key):
+    """Drops a cold entry and its single-flight lock; caller holds _lock."""
+    _drop(key)
+    _key_locks.pop(key, None)
+    _stats[key[0]]["evictions"] += 1
+
+
+def _store(key, value, nbytes, now, fingerprint, max_entries):
+    """
+    Stores an entry (sized by the caller, outside _lock) as most recently used, then evicts
+    LRU entries over budget; caller holds _lock.
+    """
+    global _total_bytes
+    _drop(key)
+    _entries[key] = (value, now, fingerprint, nbytes)
+    _total_bytes += nbytes
+
+    name = key[0]
+    if max_entries is not None:
+        own = [k for k in _entries if k[0] == name]
+        for stale in own[:max(0, len(own) - max_entries)]:
+            _evict(stale)
+    # Least recently used first; the entry just stored is never evicted
+    while _total_bytes > MAX_CACHE_BYTES and len(_entries) > 1:
+        victim = next(iter(_entries))
+        if victim == key:
+            break
+        _evict(victim)
+
+
+def cached(ttl=None, watch=None, max_entries=None):
+    """
+    Process-wide memoization shared by every Streamlit session.
+
+    An entry is reused until it is older than `ttl` seconds or the mtime of any
+    file returned by `watch(*args, **kwargs)` changes. None results (failed loads) are not
+    stored. Returned objects are shared, so callers must treat them as read-only.
+
+    Entries are sized with sizeof(); beyond DASHBOARD_CACHE_MAX_MB in total, or `max_entries`
+    for this function, the least recently used ones are evicted.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            fingerprint = file_fingerprint(*watch(*args, **kwargs)) if watch else ()
+            max_age = DEFAULT_TTL if ttl is None else ttl
+            now = time.monotonic()
+
+            def lookup():
+                entry = _entries.get(key)
+                if entry and entry[2] == fingerprint and now - entry[1] < max_age:
+                    _stats[name]["hits"] += 1
+                    _entries.move_to_end(key)
+                    return True, entry[0]
+                if entry:
+                    _drop(key)  # expired or invalidated: release it now rather than on the next store
+                return False, None
+
+            with _lock:
+                _stats.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0})
+                found, value = lookup()
+                if found:
+                    return value
+                key_lock = _key_locks.setdefault(key, threading.Lock())
+
+            # Single flight: concurrent sessions missing the same key wait for one computation
+            with key_lock:
+                with _lock:
+                    found, value = lookup()
+                    if found:
+                        return value
+                    _stats[name]["misses"] += 1
+
+                value = func(*args, **kwargs)
+                if value is not None:
+                    # Sizing walks object columns and frames; keep it out of the lock every lookup takes
+                    nbytes = sizeof(value)
+                    with _lock:
+                        _store(key, value, nbytes, now, fingerprint, max_entries)
+                return value
+
+        wrapper.cache_clear = lambda: clear_cache(name)
+        return wrapper
+
+    return decorator
+
+
+def clear_cache(name=None):
+    """Drops cached entries for one function (by "module.qualname") or for all of them."""
+    with _lock:
+        for key in [k for k in _entries if name is None or k[0] == name]:
+            _drop(key)
+
+
+def cache_stats():
+    """Returns a snapshot of hit/miss/eviction counters, entry counts and bytes per cached function."""
+    with _lock:
+        counts, sizes = {}, {}
+        for key, entry in _entries.items():
+            counts[key[0]] = counts.get(key[0], 0) + 1
+            sizes[key[0]] = sizes.get(key[0], 0) + entry[3]
+        return {
+            name: {**counters, "entries": counts.get(name, 0), "bytes": sizes.get(name, 0)}
+            for name, counters in _stats.items()
+        }
+
+
+def cache_size():
+    """Returns (total bytes held, budget in bytes)."""
+    with _lock:
+        return _total_bytes, MAX_CACHE_BYTES
@@ -0,0 +1,153 @@
+# File: src_streamlit/duckdb_pool.py
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DuckDB/MotherDuck connections.
+
+    Extensions are installed once per process and loaded once per connection.
+    Idle connections are health-checked on checkout and transparently replaced
+    if they are no longer usable.
+    """
+
+    def __init__(self, database, extensions=(), max_size=4, timeout=30.0):
+        self.database = database
+        self.extensions = tuple(extensions)
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._installed = set()
+        self._closed = False
+        self._created = 0
+        self._in_use = 0
+
+    def _connect(self):
+        import duckdb  # deferred until the first remote layer is actually requested
+        con = duckdb.connect(self.database)
+        try:
+            for ext in self.extensions:
+                with self._lock:
+                    needs_install = ext not in self._installed
+                if needs_install:
+                    con.install_extension(ext)
+                    with self._lock:
+                        self._installed.add(ext)
+                con.load_extension(ext)
+        except Exception:
+            con.close()
+            raise
+        with self._lock:
+            self._created += 1
+        return con
+
+    @staticmethod
+    def _is_healthy(con):
+        try:
+            con.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(con):
+        try:
+            con.close()
+        except Exception:
+            pass
+
+    def checkout(self):
+        """Borrows a connection; blocks up to `timeout` seconds when the pool is exhausted."""
+        if self._closed:
+            raise RuntimeError(f"Connection pool for {self.database!r} is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No DuckDB connection available within {self.timeout}s")
+
+        try:
+            while True:
+                try:
+                    con = self._idle.get_nowait()
+                except queue.Empty:
+                    con = self._connect()
+                    break
+                if self._is_healthy(con):
+                    break
+                # Stale connection (e.g. dropped by MotherDuck): replace it
+                self._discard(con)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+        return con
+
+    def release(self, con, broken=False):
+        """Returns a borrowed connection; broken connections are closed instead of reused."""
+        try:
+            if broken or self._closed:
+                self._discard(con)
+            else:
+                self._idle.put(con)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager wrapping checkout/release."""
+        con = self.checkout()
+        try:
+            yield con
+        except Exception:
+            self.release(con, broken=not self._is_healthy(con))
+            raise
+        else:
+            self.release(con)
+
+    def close(self):
+        """Closes all idle connections; connections still in use are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "created": self._created,
+                "idle": self._idle.qsize(),
+                "in_use": self._in_use,
+                "max_size": self.max_size,
+            }
+
+
+# --- Process-wide registry ---
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database, **kwargs):
+    """Returns the shared pool for `database`, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None or pool._closed:
+            pool = _pools[database] = ConnectionPool(database, **kwargs)
+        return pool
+
+
+@atexit.register
+def close_all_pools():
+    """Closes every pool; registered to run at interpreter shutdown."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
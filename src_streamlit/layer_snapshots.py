@@ -0,0 +1,149 @@
+# File: src_streamlit/layer_snapshots.py
+import os
+import re
+import hashlib
+import time
+import threading
+from pathlib import Path
+from src_streamlit.point_layer import PointLayer
+
+# Local snapshots of remote layers (Arrow IPC files, memory-mapped on read); DASHBOARD_SNAPSHOTS=0 disables
+SNAPSHOTS_ENABLED = os.getenv("DASHBOARD_SNAPSHOTS", "1") != "0"
+SNAPSHOT_DIR = Path(os.getenv("DASHBOARD_SNAPSHOT_DIR", Path(__file__).parent.parent / ".layer_snapshots"))
+# Snapshots older than this (seconds) are still served, but re-validated in the background
+SNAPSHOT_MAX_AGE = float(os.getenv("DASHBOARD_SNAPSHOT_MAX_AGE", 3600))
+# Bookkeeping column of incrementally synced tables (GIS_format_converter), never part of a layer;
+# LAYER_COLUMNS selects every other column and also works on tables without it
+ROW_HASH_COLUMN = "_row_hash"
+LAYER_COLUMNS = f"COLUMNS(c -> c <> '{ROW_HASH_COLUMN}')"
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def database_identity(database):
+    """
+    Token-free identity of the database a snapshot comes from: `md:<name>` for MotherDuck
+    (also when no credentials are configured), the resolved file path for a local DuckDB file.
+    """
+    if not database or database.startswith("md:"):
+        return (database or "md:").split("?", 1)[0]
+    return str(Path(database).resolve())
+
+
+def snapshot_path(table_name, source):
+    """Snapshot file of one table; the source is part of the name so databases never share a file."""
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", table_name)
+    digest = hashlib.sha1(source.encode()).hexdigest()[:10]
+    return SNAPSHOT_DIR / f"{safe_name}-{digest}.arrow"
+
+
+def remote_version(con, table_name):
+    """
+    Cheap change check for a remote table: the version recorded by upload_parquet_to_motherduck
+    in <schema>._table_versions, falling back to the row count for tables uploaded without it.
+    """
+    schema, _, short_name = table_name.rpartition(".")
+    if schema:
+        try:
+            row = con.execute(f"SELECT version FROM {schema}._table_versions WHERE table_name = ?",
+                              [short_name]).fetchone()
+            if row:
+                return f"v{row[0]}"
+        except Exception:
+            pass  # No version table yet
+    return str(con.execute(f"SELECT count(*) FROM {table_name}").fetchone()[0])
+
+
+def read_snapshot(table_name, source):
+    """
+    Memory-maps the snapshot; returns (arrow Table, metadata dict) or None if absent, unreadable
+    or written from a different database than `source` (see database_identity).
+    """
+    path = snapshot_path(table_name, source)
+    if not path.exists():
+        return None
+    import pyarrow as pa
+    try:
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"DEBUG: Unreadable snapshot {path}: {e}")
+        return None
+    metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+    if metadata.get("source") != source:
+        print(f"DEBUG: Ignoring snapshot {path}: written from {metadata.get('source')!r}, not {source!r}")
+        return None
+    metadata["age"] = time.time() - path.stat().st_mtime
+    return table, metadata
+
+
+def write_snapshot(con, table_name, source, version=None):
+    """Streams the full remote table into a new snapshot file (atomic replace); returns the row count."""
+    import pyarrow as pa
+    version = version or remote_version(con, table_name)
+    path = snapshot_path(table_name, source)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+
+    reader = con.execute(
+        f"SELECT {LAYER_COLUMNS} FROM {table_name} WHERE Longitude IS NOT NULL AND Latitude IS NOT NULL"
+    ).fetch_record_batch()
+    schema = reader.schema.with_metadata({"table": table_name, "source": source, "version": version})
+    rows = 0
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    os.replace(tmp, path)
+    return rows
+
+
+def snapshot_to_layer(table):
+    """Converts a snapshot table to a PointLayer (single-chunk numeric columns without nulls stay zero-copy)."""
+    columns = {}
+    for name in table.column_names:
+        if name == ROW_HASH_COLUMN:
+            continue  # snapshots written before the column was excluded
+        column = table.column(name)
+        if len(column.chunks) > 1:
+            column = column.combine_chunks()
+        columns[name] = column.to_numpy(zero_copy_only=False)
+    return PointLayer.from_columns(columns, lat_col="Latitude", lon_col="Longitude")
+
+
+def snapshot_count(table, bbox=None):
+    """Rows of a snapshot table inside bbox = (west, south, east, north); reads only the coordinates."""
+    return len(snapshot_to_layer(table.select(["Latitude", "Longitude"])).clip(bbox))
+
+
+def refresh_snapshot(pool, table_name):
+    """Re-validates one snapshot: rewrites it if the remote version changed, else just marks it fresh."""
+    source = database_identity(pool.database)
+    with pool.connection() as con:
+        version = remote_version(con, table_name)
+        existing = read_snapshot(table_name, source)
+        if existing and existing[1].get("version") == version:
+            os.utime(snapshot_path(table_name, source))
+            return
+        rows = write_snapshot(con, table_name, source, version=version)
+        print(f"Snapshot refreshed {table_name} from {source}: {rows} rows")
+
+
+def refresh_snapshot_async(pool, table_name):
+    """Runs refresh_snapshot on a daemon thread; at most one refresh per (database, table) at a time."""
+    key = (database_identity(pool.database), table_name)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            refresh_snapshot(pool, table_name)
+        except Exception as e:
+            print(f"DEBUG: Snapshot refresh failed for {table_name}: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, name=f"snapshot-{table_name}", daemon=True).start()
@@ -0,0 +1,172 @@
+# File: src_streamlit/metrics.py
+import os
+import json
+import time
+import threading
+import functools
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from src_streamlit.data_cache import cache_stats, cache_size
+
+# DASHBOARD_METRICS=0 turns the timers into no-ops; DASHBOARD_METRICS_LOG appends every observation as a JSON line
+METRICS_ENABLED = os.getenv("DASHBOARD_METRICS", "1") != "0"
+METRICS_LOG = os.getenv("DASHBOARD_METRICS_LOG")
+
+# Latency histogram bucket bounds in seconds (Prometheus `le` labels)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+RECENT_SAMPLES = 1024  # per-stage window used for the p50/p95 shown in the admin panel
+
+_lock = threading.Lock()
+_stages = {}  # stage -> counters, bucket counts and recent latencies
+
+
+def _new_stage():
+    return {"count": 0, "errors": 0, "seconds": 0.0, "rows": 0, "bytes": 0,
+            "buckets": [0] * len(BUCKETS), "recent": deque(maxlen=RECENT_SAMPLES)}
+
+
+def record(stage, seconds, rows=None, nbytes=None, error=False):
+    """Adds one observation of `stage` (latency in seconds, optional row count and bytes)."""
+    with _lock:
+        s = _stages.setdefault(stage, _new_stage())
+        s["count"] += 1
+        s["errors"] += bool(error)
+        s["seconds"] += seconds
+        s["rows"] += rows or 0
+        s["bytes"] += nbytes or 0
+        s["buckets"][bisect_left(BUCKETS, seconds)] += 1
+        s["recent"].append(seconds)
+
+    if METRICS_LOG:
+        line = {"ts": round(time.time(), 3), "stage": stage, "seconds": round(seconds, 6),
+                "rows": rows, "bytes": nbytes, "error": bool(error), "thread": threading.current_thread().name}
+        try:
+            with open(METRICS_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line) + "\n")
+        except OSError as e:
+            print(f"WARNING: Could not write metrics log {METRICS_LOG}: {e}")
+
+
+def _result_size(result, *args, **kwargs):
+    """Default (rows, bytes) of a stage result: PointLayers and other sized, array-backed objects."""
+    rows = len(result) if hasattr(result, "__len__") else None
+    return rows, getattr(result, "nbytes", None)
+
+
+@contextmanager
+def timer(stage):
+    """Times the enclosed block as one observation of `stage`."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        record(stage, time.perf_counter() - start, error=error)
+
+
+def instrument(stage=None, measure=_result_size):
+    """
+    Records the latency of every call as an observation of `stage` (default: the function name).
+    `measure(result, *args, **kwargs)` returns (rows, bytes) for the call; either may be None.
+    """
+    def decorator(func):
+        name = stage or func.__name__.lstrip("_")
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                record(name, time.perf_counter() - start, error=True)
+                raise
+            elapsed = time.perf_counter() - start
+            try:
+                rows, nbytes = measure(result, *args, **kwargs) if measure else (None, None)
+            except Exception:
+                rows, nbytes = None, None
+            record(name, elapsed, rows=rows, nbytes=nbytes)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def metrics_snapshot():
+    """Returns per-stage totals plus p50/p95/max over the most recent observations."""
+    with _lock:
+        stages = {name: {**s, "buckets": list(s["buckets"]), "recent": sorted(s["recent"])}
+                  for name, s in _stages.items()}
+
+    summary = {}
+    for name, s in sorted(stages.items()):
+        recent = s.pop("recent")
+        summary[name] = {
+            **{k: v for k, v in s.items() if k != "buckets"},
+            "mean": s["seconds"] / s["count"] if s["count"] else None,
+            "p50": _quantile(recent, 0.50),
+            "p95": _quantile(recent, 0.95),
+            "max": recent[-1] if recent else None,
+            "buckets": dict(zip(BUCKETS, s["buckets"])),
+        }
+    return summary
+
+
+def prometheus_text():
+    """Renders stage histograms, row/byte counters and loader cache counters in Prometheus text format."""
+    lines = [
+        "# HELP dashboard_stage_seconds Latency of instrumented dashboard stages.",
+        "# TYPE dashboard_stage_seconds histogram",
+    ]
+    snapshot = metrics_snapshot()
+    for name, s in snapshot.items():
+        cumulative = 0
+        for bound, count in s["buckets"].items():
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'dashboard_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'dashboard_stage_seconds_sum{{stage="{name}"}} {s["seconds"]:.6f}')
+        lines.append(f'dashboard_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+
+    for metric, field, help_text in (("dashboard_stage_rows_total", "rows", "Rows returned by a stage."),
+                                     ("dashboard_stage_bytes_total", "bytes", "Bytes returned by a stage."),
+                                     ("dashboard_stage_errors_total", "errors", "Stage calls that raised.")):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{stage="{name}"}} {s[field]}' for name, s in snapshot.items()]
+
+    cache = cache_stats()
+    for metric, field, help_text in (("dashboard_cache_hits_total", "hits", "Loader cache hits."),
+                                     ("dashboard_cache_misses_total", "misses", "Loader cache misses."),
+                                     ("dashboard_cache_evictions_total", "evictions", "Loader cache LRU evictions.")):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{function="{name}"}} {c[field]}' for name, c in sorted(cache.items())]
+    for metric, field, help_text in (("dashboard_cache_entries", "entries", "Entries held by the loader cache."),
+                                     ("dashboard_cache_bytes", "bytes", "Private bytes held by the loader cache.")):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{function="{name}"}} {c[field]}' for name, c in sorted(cache.items())]
+    held, budget = cache_size()
+    lines += ["# HELP dashboard_cache_budget_bytes Loader cache budget (DASHBOARD_CACHE_MAX_MB).",
+              "# TYPE dashboard_cache_budget_bytes gauge", f"dashboard_cache_budget_bytes {budget:.0f}"]
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    """Clears every recorded observation."""
+    with _lock:
+        _stages.clear()
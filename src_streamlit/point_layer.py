@@ -0,0 +1,186 @@
+# File: src_streamlit/point_layer.py
+import sys
+from pathlib import Path
+import numpy as np
+
+
+def _plain_array(values):
+    """Converts a (possibly masked) column to a read-only NumPy array; nulls become NaN/None."""
+    if isinstance(values, np.ma.MaskedArray):
+        mask = np.ma.getmaskarray(values)
+        if not mask.any():
+            arr = np.asarray(values.data)
+        elif values.dtype.kind in "fiub":
+            arr = values.astype("float64").filled(np.nan)
+        else:
+            arr = np.asarray(values.data, dtype=object).copy()
+            arr[mask] = None
+    else:
+        arr = np.asarray(values)
+    arr.flags.writeable = False
+    return arr
+
+
+def _file_mappings():
+    """(start, end) addresses of the file-backed memory mappings of this process; empty where /proc is missing."""
+    try:
+        lines = Path("/proc/self/maps").read_text().splitlines()
+    except OSError:
+        return []
+    regions = []
+    for line in lines:
+        # address perms offset dev inode pathname
+        fields = line.split(maxsplit=5)
+        if len(fields) == 6 and fields[4] != "0" and fields[5].startswith("/"):
+            start, end = fields[0].split("-")
+            regions.append((int(start, 16), int(end, 16)))
+    return regions
+
+
+def is_mapped(arr, regions=None):
+    """
+    True if the array's data lies in a memory-mapped file (e.g. read zero-copy from an Arrow snapshot).
+    Checked against the process's file mappings, so heap copies (combine_chunks, nulls) are not mapped.
+    """
+    if arr.dtype == object or arr.nbytes == 0:
+        return False
+    address = arr.__array_interface__["data"][0]
+    return any(start <= address < end for start, end in (_file_mappings() if regions is None else regions))
+
+
+def _array_nbytes(arr):
+    """Array memory, plus the distinct Python objects (e.g. strings) an object array points to."""
+    if arr.dtype != object:
+        return arr.nbytes
+    distinct = {id(v): v for v in arr.ravel()}  # repeated objects count once
+    return arr.nbytes + sum(map(sys.getsizeof, distinct.values()))
+
+
+def grid_side(max_points, points_per_cell=16):
+    """Grid resolution (cells per axis) used for level-of-detail sampling."""
+    return max(1, int(round((max_points / points_per_cell) ** 0.5)))
+
+
+class PointLayer:
+    """
+    Columnar point layer: float64 lat/lon arrays plus one typed NumPy array per property.
+
+    Replaces the list of {'lat', 'lon', **props} dicts so layers flow from the
+    loader to the map without per-point Python objects. Arrays are read-only and
+    may be shared across sessions; slicing returns a new layer.
+    """
+
+    __slots__ = ("lat", "lon", "columns", "_nbytes")
+
+    def __init__(self, lat, lon, columns=None):
+        self.lat = _plain_array(np.asarray(lat, dtype="float64"))
+        self.lon = _plain_array(np.asarray(lon, dtype="float64"))
+        self.columns = {name: _plain_array(values) for name, values in (columns or {}).items()}
+        self._nbytes = None
+
+    @classmethod
+    def from_columns(cls, columns, lat_col="Latitude", lon_col="Longitude"):
+        """Builds a layer from a {name: array} mapping (e.g. DuckDB `fetchnumpy()`)."""
+        return cls(_plain_array(columns[lat_col]), _plain_array(columns[lon_col]), columns)
+
+    @classmethod
+    def from_geojson(cls, gj):
+        """Builds a layer from a GeoJSON FeatureCollection, skipping features without coordinates."""
+        features = (gj or {}).get('features', []) or []
+        lat, lon, props = [], [], []
+        for f in features:
+            coords = (f.get('geometry', {}) or {}).get('coordinates') or []
+            # GeoJSON is [lon, lat]
+            if len(coords) >= 2 and coords[0] is not None and coords[1] is not None:
+                lon.append(coords[0])
+                lat.append(coords[1])
+                props.append(f.get('properties', {}) or {})
+
+        names = list(dict.fromkeys(k for p in props for k in p))
+        columns = {}
+        for name in names:
+            values = [p.get(name) for p in props]
+            numeric = all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values)
+            if numeric and any(v is not None for v in values):
+                # Numbers (with gaps as NaN) become a typed column
+                arr = np.asarray([np.nan if v is None else v for v in values])
+                if arr.dtype.kind not in "iuf":
+                    arr = arr.astype("float64")
+            elif all(isinstance(v, bool) for v in values) and values:
+                arr = np.asarray(values, dtype=bool)
+            else:
+                # Anything else (strings, lists, nested objects) is a 1-D object column
+                arr = np.empty(len(values), dtype=object)
+                arr[:] = values
+            columns[name] = arr
+        return cls(lat, lon, columns)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __getitem__(self, index):
+        """Slices by slice, integer index array or boolean mask."""
+        return PointLayer(self.lat[index], self.lon[index],
+                          {name: values[index] for name, values in self.columns.items()})
+
+    def take(self, indices):
+        return self[np.asarray(indices, dtype="intp")]
+
+    def column(self, name, default=None):
+        return self.columns.get(name, default)
+
+    def clip(self, bbox):
+        """Keeps points inside bbox = (west, south, east, north)."""
+        if bbox is None:
+            return self
+        west, south, east, north = bbox
+        mask = (self.lon >= west) & (self.lon <= east) & (self.lat >= south) & (self.lat <= north)
+        return self if mask.all() else self[mask]
+
+    def grid_sample(self, max_points, bbox=None):
+        """
+        Deterministic stratified sample of at most `max_points` points.
+        Points are binned on a grid over bbox (default: layer extent) and each cell
+        contributes its points in turn, so sparse regions keep their markers.
+        """
+        n = len(self)
+        if max_points is None or n <= max_points:
+            return self
+        if max_points <= 0:
+            return self[:0]
+
+        west, south, east, north = bbox or (self.lon.min(), self.lat.min(), self.lon.max(), self.lat.max())
+        side = grid_side(max_points)
+        gx = np.clip(((self.lon - west) / max(east - west, 1e-9) * side).astype("int64"), 0, side - 1)
+        gy = np.clip(((self.lat - south) / max(north - south, 1e-9) * side).astype("int64"), 0, side - 1)
+        cell = gy * side + gx
+
+        # Rank of each point within its cell (stable order), then take lowest ranks first
+        order = np.lexsort((np.arange(n), cell))
+        sorted_cells = cell[order]
+        starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+        rank = np.empty(n, dtype="int64")
+        rank[order] = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+        keep = np.sort(np.lexsort((np.arange(n), rank))[:max_points])
+        return self[keep]
+
+    @property
+    def nbytes(self):
+        """Memory footprint, including the strings of object columns (computed once; arrays are read-only)."""
+        if self._nbytes is None:
+            self._nbytes = sum(_array_nbytes(a) for a in (self.lat, self.lon, *self.columns.values()))
+        return self._nbytes
+
+    @property
+    def mapped_nbytes(self):
+        """Part of nbytes read zero-copy from memory-mapped snapshot files (shared via the page cache)."""
+        regions = _file_mappings()
+        return sum(a.nbytes for a in (self.lat, self.lon, *self.columns.values()) if is_mapped(a, regions))
+
+    def to_frame(self):
+        """Returns a pandas DataFrame with lat/lon followed by the property columns."""
+        import pandas as pd
+        return pd.DataFrame({'lat': self.lat, 'lon': self.lon, **self.columns}, copy=False)
+
+    def __repr__(self):
+        return f"PointLayer({len(self)} points, columns={list(self.columns)})"
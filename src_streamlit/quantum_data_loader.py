@@ -1,16 +1,40 @@
 # File: src_streamlit/quantum_data_loader.py
-import json, os
+import json, os, time
+import numpy as np
 import yaml
 from pathlib import Path
-import duckdb
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 import streamlit as st
+from src_streamlit.data_cache import cached, cache_stats
+from src_streamlit.metrics import instrument
+from src_streamlit.duckdb_pool import get_pool
+from src_streamlit.point_layer import PointLayer, grid_side
+from src_streamlit.clustering import cluster_points
+from src_streamlit.spatial_index import SpatialIndex
+from src_streamlit.scenario_model import ScenarioModel
+from src_streamlit.layer_snapshots import (
+    SNAPSHOTS_ENABLED, SNAPSHOT_MAX_AGE, LAYER_COLUMNS, database_identity, read_snapshot, snapshot_count, snapshot_to_layer,
+    refresh_snapshot_async
+)
 
 # --- Constants & Helpers ---
 BASE_DIR = Path(__name__).resolve().parent
 YAML_PATH = BASE_DIR / 'DashboardInput.yaml'
 load_dotenv()
 
+# Map viewport (west, south, east, north) and per-layer marker budget pushed down to layer queries
+MAP_VIEWPORT = (-135.0, 20.0, -60.0, 55.0)
+MAX_MAP_POINTS = int(os.getenv("DASHBOARD_MAX_MAP_POINTS", 20000))
+# Layers above CLUSTER_MIN_POINTS (never below MAX_MAP_POINTS) are drawn as clusters computed for
+# MAP_CLUSTER_ZOOM; smaller layers keep individual markers, sampled to MAX_MAP_POINTS in the query
+CLUSTER_MIN_POINTS = max(int(os.getenv("DASHBOARD_CLUSTER_MIN_POINTS", 5 * MAX_MAP_POINTS)), MAX_MAP_POINTS)
+MAP_CLUSTER_ZOOM = int(os.getenv("DASHBOARD_CLUSTER_ZOOM", 4))
+# Layers are fetched concurrently; each rerun waits at most LAYER_TIMEOUT seconds for them
+LAYER_TIMEOUT = float(os.getenv("DASHBOARD_LAYER_TIMEOUT", 20))
+_layer_executor = ThreadPoolExecutor(max_workers=int(os.getenv("DASHBOARD_LAYER_WORKERS", 8)),
+                                     thread_name_prefix="layer-loader")
+
 
 def get_motherduck_token():
     """Retrieves token from Streamlit Secrets or Environment Variables."""
@@ -22,12 +46,25 @@ def get_motherduck_token():
     return os.getenv("MOTHERDUCK_TOKEN")
 
 
-def _load_yaml(path):
-    """Reads YAML with relative-to-file path resolution."""
-    # Resolve relative to this script's directory if not absolute
+def _resolve_path(path):
+    """Resolves a path relative to the project root if not absolute."""
     p = Path(path)
     if not p.is_absolute():
         p = Path(__file__).parent.parent / p  # Adjust '.parent' count based on folder depth
+    return p
+
+
+def _yaml_size(result, path):
+    """(rows, bytes) recorded for a YAML load: top-level keys and file size."""
+    p = _resolve_path(path)
+    return len(result), p.stat().st_size if p.exists() else None
+
+
+@cached(ttl=float("inf"), watch=lambda path: [_resolve_path(path)])
+@instrument(measure=_yaml_size)
+def _load_yaml(path):
+    """Reads YAML with relative-to-file path resolution (re-parsed only when the file changes)."""
+    p = _resolve_path(path)
 
     if not p.exists():
         print(f"DEBUG: File not found: {p}")
@@ -39,38 +76,132 @@ def _load_yaml(path):
         print(f"DEBUG: Error loading {p}: {e}")
         return {}
 
-def _fetch_from_motherduck(table_name):
+
+def _config_files(*args, **kwargs):
+    """Files whose modification invalidates the cached getters (main YAML + style file); getter args are ignored."""
+    style_filename = _load_yaml(YAML_PATH).get("gis_layers", {}).get('style')
+    return [YAML_PATH, BASE_DIR / style_filename] if style_filename else [YAML_PATH]
+
+
+def get_database_uri():
+    """
+    Returns the DuckDB database to query for motherduck:// layers.
+    DASHBOARD_DUCKDB_PATH points at a local DuckDB file standing in for MotherDuck
+    (e.g. `my_db.duckdb`, which exposes the same `my_db.main.<table>` names).
+    """
+    local_db = os.getenv("DASHBOARD_DUCKDB_PATH")
+    if local_db:
+        return str(_resolve_path(local_db))
+
     token = get_motherduck_token()
-    if not token:
-        print(f"Error: MOTHERDUCK_TOKEN not found for {table_name}")
+    # Pass the token explicitly in the connection string for maximum flexibility
+    return f"md:?motherduck_token={token}" if token else None
+
+
+def get_connection_pool():
+    """
+    Returns the shared connection pool, or None without credentials.
+    Extensions listed in DASHBOARD_DUCKDB_EXTENSIONS (default: none) are loaded once per connection.
+    """
+    database = get_database_uri()
+    if not database:
         return None
+    extensions = [e.strip() for e in os.getenv("DASHBOARD_DUCKDB_EXTENSIONS", "").split(",") if e.strip()]
+    return get_pool(database, extensions=extensions, max_size=int(os.getenv("DASHBOARD_DB_POOL_SIZE", 4)))
+
+
+def _layer_filter(bbox=None):
+    """WHERE clause keeping rows with coordinates, inside bbox = (west, south, east, north) if given."""
+    filters = ["Longitude IS NOT NULL", "Latitude IS NOT NULL"]
+    if bbox:
+        west, south, east, north = (float(v) for v in bbox)
+        filters += [f"Longitude BETWEEN {west} AND {east}", f"Latitude BETWEEN {south} AND {north}"]
+    return " AND ".join(filters)
+
+
+def _layer_query(table_name, bbox=None, max_points=None):
+    """
+    Builds the layer query. bbox = (west, south, east, north) is pushed down as a range
+    predicate on the raw coordinates; max_points caps the result with a deterministic
+    grid-stratified sample (every occupied cell contributes before any cell repeats).
+    """
+    query = f"SELECT {LAYER_COLUMNS} FROM {table_name} WHERE {_layer_filter(bbox)}"
+    if not max_points:
+        return query
+
+    if bbox:
+        west, south, east, north = (repr(float(v)) for v in bbox)
+    else:
+        west, south, east, north = ("(SELECT min(Longitude) FROM pts)", "(SELECT min(Latitude) FROM pts)",
+                                    "(SELECT max(Longitude) FROM pts)", "(SELECT max(Latitude) FROM pts)")
+    side = grid_side(max_points)
+    gx = f"least(greatest(floor((Longitude - {west}) / greatest({east} - {west}, 1e-9) * {side}), 0), {side - 1})"
+    gy = f"least(greatest(floor((Latitude - {south}) / greatest({north} - {south}, 1e-9) * {side}), 0), {side - 1})"
+    return f"""
+        WITH pts AS ({query}),
+        ranked AS (
+            SELECT *, row_number() OVER (
+                PARTITION BY {gx}, {gy} ORDER BY hash(Longitude, Latitude)
+            ) AS _lod_rank
+            FROM pts
+        )
+        SELECT * EXCLUDE (_lod_rank) FROM ranked
+        ORDER BY _lod_rank, hash(Longitude, Latitude)
+        LIMIT {int(max_points)}
+    """
+
+
+def _load_snapshot(table_name, pool, bbox=None, max_points=None):
+    """
+    Serves a layer from its local snapshot (re-validated in the background when stale).
+    Only snapshots written from the configured database are used.
+    """
+    source = database_identity(pool.database if pool is not None else get_database_uri())
+    snapshot = read_snapshot(table_name, source)
+    if snapshot is None:
+        return None
+    table, metadata = snapshot
+    if pool is not None and metadata["age"] > SNAPSHOT_MAX_AGE:
+        refresh_snapshot_async(pool, table_name)
+    return snapshot_to_layer(table).clip(bbox).grid_sample(max_points, bbox)
+
+
+@instrument()
+def _fetch_from_motherduck(table_name, bbox=None, max_points=None):
+    pool = get_connection_pool()
+
+    # Local snapshot first: instant cold start and offline fallback
+    if SNAPSHOTS_ENABLED:
+        layer = _load_snapshot(table_name, pool, bbox=bbox, max_points=max_points)
+        if layer is not None:
+            return layer
+
+    if pool is None:
+        raise RuntimeError(f"MOTHERDUCK_TOKEN not found for {table_name}")
 
     try:
-        # Pass the token explicitly in the connection string for maximum flexibility
-        con = duckdb.connect(f"md:?motherduck_token={token}")
-        con.execute("INSTALL spatial; LOAD spatial;")
-
-        query = f"SELECT *, ST_AsGeoJSON(ST_Point(Longitude, Latitude)) as geometry FROM {table_name}"
-        df = con.execute(query).df()
-
-        features = [
-            {
-                "type": "Feature",
-                "geometry": json.loads(row["geometry"]),
-                "properties": row.drop("geometry").to_dict()
-            }
-            for _, row in df.iterrows()
-        ]
-        return {"type": "FeatureCollection", "features": features}
+        # Raw coordinates instead of ST_AsGeoJSON: no per-row JSON serialize/parse round trip
+        query = _layer_query(table_name, bbox=bbox, max_points=max_points)
+        with pool.connection() as con:
+            columns = con.execute(query).fetchnumpy()
+
+        if SNAPSHOTS_ENABLED:
+            # Download the full table for the next cold start without blocking this rerun
+            refresh_snapshot_async(pool, table_name)
+        return PointLayer.from_columns(columns, lat_col="Latitude", lon_col="Longitude")
     except Exception as e:
-        st.error(f"MotherDuck Error ({table_name}): {e}")
-        return None
+        # Raised rather than shown: layers load on worker threads without a ScriptRunContext
+        raise RuntimeError(f"MotherDuck Error ({table_name}): {e}") from e
 
 
-def _load_geojson_file(resource_identifier):
-    """Unified loader: Detects MotherDuck URI or Local Path."""
+def _load_geojson_file(resource_identifier, bbox=None, max_points=None):
+    """
+    Unified loader: Detects MotherDuck URI (-> PointLayer) or Local Path (-> GeoJSON dict).
+    bbox/max_points are applied server-side for MotherDuck; local files are filtered after extraction.
+    """
     if resource_identifier.startswith("motherduck://"):
-        return _fetch_from_motherduck(resource_identifier.replace("motherduck://", ""))
+        return _fetch_from_motherduck(resource_identifier.replace("motherduck://", ""),
+                                      bbox=bbox, max_points=max_points)
 
     p = Path(resource_identifier)
     # Ensure local files are found relative to the project root
@@ -80,30 +211,21 @@ def _load_geojson_file(resource_identifier):
     if p.exists():
         return json.loads(p.read_text(encoding='utf-8'))
 
-    st.warning(f"Resource not found: {resource_identifier}")
-    return None
+    raise FileNotFoundError(f"Resource not found: {resource_identifier}")
 
 
+@instrument()
 def _extract_points(gj):
-    """Convert GeoJSON to flat list of points for Streamlit map."""
-    if not gj:
-        return []
-    features = gj.get('features', []) or []
-    results = []
-    for f in features:
-        geom = f.get('geometry', {}) or {}
-        props = f.get('properties', {}) or {}
-        coords = geom.get('coordinates') or []
-        # GeoJSON is [lon, lat]
-        lon, lat = (coords[0], coords[1]) if len(coords) >= 2 else (None, None)
-        if lat is not None and lon is not None:
-            entry = {'lat': lat, 'lon': lon}
-            entry.update(props)
-            results.append(entry)
-    return results
+    """Convert a loaded resource (GeoJSON or PointLayer) to a columnar PointLayer for the map."""
+    if gj is None:
+        return PointLayer([], [])
+    if isinstance(gj, PointLayer):
+        return gj
+    return PointLayer.from_geojson(gj)
 
 
 # --- 1. Display Text Functions ---
+@cached(watch=_config_files)
 def get_display_text():
     """
     Returns the dashboard textual content (titles, markdown descriptions)
@@ -117,6 +239,7 @@ def get_display_text():
 
 
 # --- 2. Display Barcharts Data ---
+@cached(watch=_config_files)
 def get_barchart_data():
     """
     Returns the raw data needed for the resource bar charts.
@@ -125,26 +248,194 @@ def get_barchart_data():
     return data.get("bar_chart_data", {})
 
 
+def _index_barchart_data(chart_data):
+    """
+    Flattens bar_chart_data into a table indexed by (scenario, scale, resource) with
+    `value` (sum over entries) and `error` (errors combined in quadrature).
+    """
+    import pandas as pd
+    records = [{**e, "scenario": scenario} for scenario, entries in (chart_data or {}).items() for e in entries]
+    if not records:
+        return pd.DataFrame(columns=["value", "error"],
+                            index=pd.MultiIndex.from_tuples([], names=["scenario", "scale", "resource"]))
+
+    df = pd.DataFrame.from_records(records)
+    resources = [c for c in df.columns if c not in ("scenario", "scale") and not str(c).endswith("Err")]
+    keys = [df["scenario"], df["scale"]]
+    values = df[resources].apply(pd.to_numeric, errors="coerce").fillna(0).groupby(keys).sum()
+    errors = (df.reindex(columns=[f"{r}Err" for r in resources]).apply(pd.to_numeric, errors="coerce")
+              .fillna(0).pow(2).set_axis(resources, axis=1).groupby(keys).sum().pow(0.5))
+
+    table = pd.DataFrame({"value": values.stack(), "error": errors.stack()})
+    table.index.names = ["scenario", "scale", "resource"]
+    return table.sort_index()
+
+
+@cached(watch=_config_files)
+def get_barchart_table():
+    """Returns bar_chart_data indexed once as (scenario, scale, resource) -> (value, error)."""
+    return _index_barchart_data(get_barchart_data())
+
+
+# --- 2b. Parametric Scenarios ---
+CUSTOM_SCENARIO = "Custom scenario"
+# Slider inputs make these keys unbounded; keep only the most recently used evaluations
+SCENARIO_CACHE_ENTRIES = 256
+
+
+@cached(watch=_config_files)
+def get_scenario_model():
+    """Returns the ScenarioModel built from the `scenario_model` YAML section (None if absent)."""
+    data = _load_yaml(YAML_PATH)
+    model_config = data.get("scenario_model")
+    if not model_config:
+        return None
+    resources = list(data.get("bar_chart_info", {}).get("labels", {})) or None
+    return ScenarioModel.from_config(model_config, data.get("bar_chart_data", {}), resources=resources)
+
+
+@cached(watch=_config_files, max_entries=SCENARIO_CACHE_ENTRIES)
+def get_custom_scenario_table(configuration, penetration, logical_qubits, physical_per_logical, qubit_density):
+    """One evaluated scenario, indexed like get_barchart_table(); memoized per parameter tuple."""
+    import pandas as pd
+    model = get_scenario_model()
+    if model is None or configuration not in model.configurations:
+        return None
+    values, errors = model.evaluate(configuration, penetration, logical_qubits, physical_per_logical, qubit_density)
+    index = pd.MultiIndex.from_product([[CUSTOM_SCENARIO], [configuration], model.resources],
+                                       names=["scenario", "scale", "resource"])
+    return pd.DataFrame({"value": values, "error": errors}, index=index)
+
+
+@cached(watch=_config_files, max_entries=SCENARIO_CACHE_ENTRIES)
+def get_scenario_sweep(configuration, parameter, values, **inputs):
+    """
+    Evaluates the model along one input (`values`, a tuple) with the other `inputs` fixed,
+    in one batched call. Returns a DataFrame indexed by the swept values, one column per resource.
+    """
+    import pandas as pd
+    model = get_scenario_model()
+    if model is None or configuration not in model.configurations:
+        return None
+    result, _ = model.evaluate(configuration, **{**inputs, parameter: np.asarray(values, dtype="float64")})
+    return pd.DataFrame(result, index=pd.Index(values, name=parameter), columns=model.resources)
+
+
+def with_custom_scenario(chart_table, custom_table):
+    """Appends the custom scenario rows to the (read-only, shared) bar chart table as a new table."""
+    if custom_table is None:
+        return chart_table
+    import pandas as pd
+    return pd.concat([chart_table, custom_table]).sort_index()
+
+
 # --- 3. Display Maps Data ---
-def get_map_layers_data():
-    """Returns { LayerName: [Points] } by iterating through YAML config."""
+@cached(watch=_config_files)
+def _load_layer(uri, bbox=None, max_points=None):
+    """Loads one layer as a PointLayer limited to bbox and max_points (errors propagate and are not cached)."""
+    if max_points is not None and not uri.startswith("motherduck://"):
+        # Local files are read whole anyway: sample the cached full layer instead of parsing the file again
+        points = _load_layer(uri, bbox=bbox)
+        return points.grid_sample(max_points, bbox) if points is not None else None
+    geojson = _load_geojson_file(uri, bbox=bbox, max_points=max_points)
+    if geojson is None:
+        return None
+    return _extract_points(geojson).clip(bbox).grid_sample(max_points, bbox)
+
+
+@cached(watch=_config_files)
+def get_layer_clusters(uri, zoom, bbox=None):
+    """Cluster centroids (with counts) of one layer at a zoom level, cached per (layer, zoom, bbox)."""
+    points = _load_layer(uri, bbox=bbox)
+    return cluster_points(points, zoom) if points is not None else None
+
+
+@cached(watch=_config_files)
+def _count_layer_points(uri, bbox=None):
+    """
+    Number of points of one layer inside bbox, without fetching the layer: a count query (or the
+    local snapshot's coordinates) for MotherDuck tables; local files are loaded (and cached) whole.
+    """
+    if not uri.startswith("motherduck://"):
+        points = _load_layer(uri, bbox=bbox)
+        return len(points) if points is not None else 0
+
+    table_name = uri.replace("motherduck://", "")
+    pool = get_connection_pool()
+    if SNAPSHOTS_ENABLED:
+        snapshot = read_snapshot(table_name, database_identity(pool.database if pool is not None
+                                                               else get_database_uri()))
+        if snapshot is not None:
+            return snapshot_count(snapshot[0], bbox)
+    if pool is None:
+        raise RuntimeError(f"MOTHERDUCK_TOKEN not found for {table_name}")
+    try:
+        with pool.connection() as con:
+            return con.execute(f"SELECT count(*) FROM {table_name} WHERE {_layer_filter(bbox)}").fetchone()[0]
+    except Exception as e:
+        raise RuntimeError(f"MotherDuck Error ({table_name}): {e}") from e
+
+
+def _load_map_layer(uri, bbox=None, max_points=None, cluster_zoom=None):
+    """
+    Loads one map layer sampled to max_points in the query; with cluster_zoom set, layers with
+    more than CLUSTER_MIN_POINTS points (counted before loading) are replaced by their clusters.
+    """
+    if cluster_zoom is not None and max_points is not None and _count_layer_points(uri, bbox) > CLUSTER_MIN_POINTS:
+        return get_layer_clusters(uri, cluster_zoom, bbox=bbox)
+    return _load_layer(uri, bbox=bbox, max_points=max_points)
+
+
+@cached(watch=_config_files)
+def get_map_layer_names():
+    """Returns the configured layer names without loading any layer data."""
+    layer_config = _load_yaml(YAML_PATH).get("gis_layers", {})
+    return [name for name in layer_config if name.lower() != 'style']
+
+
+def get_map_layers_data(bbox=None, max_points=None, cluster_zoom=None, layers=None, timeout=None):
+    """
+    Returns ({ LayerName: PointLayer }, { LayerName: exception }) by iterating through YAML config.
+    With bbox = (west, south, east, north) and/or max_points, each layer is limited to the
+    viewport and down-sampled to the point budget (see MAP_VIEWPORT / MAX_MAP_POINTS).
+    With cluster_zoom, layers denser than CLUSTER_MIN_POINTS are replaced by their clusters.
+
+    Only `layers` (default: all) are loaded, concurrently. Layers that fail or exceed `timeout`
+    seconds (default LAYER_TIMEOUT) are left out and returned with their error (TimeoutError for
+    slow ones) for the caller to report from the script thread; a slow load keeps running in the
+    background and its result is picked up from the per-layer cache on a later rerun.
+    """
     layer_config = _load_yaml(YAML_PATH).get("gis_layers", {})
-    loaded_layers = {}
+    names = [name for name in get_map_layer_names() if layers is None or name in layers]
+    futures = {
+        name: _layer_executor.submit(_load_map_layer, layer_config[name], bbox, max_points, cluster_zoom)
+        for name in names
+    }
 
-    for name, uri in layer_config.items():
-        if name.lower() == 'style': continue
+    deadline_seconds = LAYER_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + deadline_seconds
+    loaded_layers, failures = {}, {}
+    for name, future in futures.items():
+        try:
+            points = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            print(f"WARNING: {name} not loaded within the layer timeout; showing partial results")
+            failures[name] = TimeoutError(f"not loaded within {deadline_seconds:g} s, still loading")
+            continue
+        except Exception as e:
+            print(f"WARNING: Failed to load {name}: {e}")
+            failures[name] = e
+            continue
 
-        geojson = _load_geojson_file(uri)
-        if geojson:
-            points = _extract_points(geojson)
-            if points:
-                loaded_layers[name] = points
-                print(f"Loaded {name}: {len(points)} points")
+        if points is not None and len(points):
+            loaded_layers[name] = points
+            print(f"Loaded {name}: {len(points)} points")
 
-    return loaded_layers
+    return loaded_layers, failures
 
 
 # --- 4. (New) Map Styles ---
+@cached(watch=_config_files)
 def get_map_styles():
     """Returns the styling configuration from map_style.yaml."""
     # 1. Load the MAIN config
@@ -171,4 +462,74 @@ def get_map_styles():
     return {
         'defaults': {'color': 'red', 'size': 10, 'opacity': 0.7},
         'layers': {}
-    }
\ No newline at end of file
+    }
+
+
+# --- 5. Proximity Analytics ---
+@cached(watch=_config_files)
+def get_layer_index(uri, bbox=None):
+    """Spatial index over the full (unsampled) layer, built once and cached with the layer itself."""
+    points = _load_layer(uri, bbox=bbox)
+    return SpatialIndex(points) if points is not None else None
+
+
+def get_proximity_config():
+    """Returns the `proximity` section of the YAML (source/target layer names, k, radius_km)."""
+    config = _load_yaml(YAML_PATH).get("proximity", {})
+    return {"k": 5, "radius_km": 50.0, **config}
+
+
+@cached(watch=_config_files)
+def get_proximity(source, target, k=5, radius_km=50.0, bbox=None):
+    """
+    Relates every site of the `source` layer to the `target` layer (both layer names), within
+    bbox (pass the map's, so the full layers are shared with the clustered map path):
+    - pairs: one row per (source site, k nearest target sites) with distance_km and rank
+    - summary: per source site, nearest target, mean distance to the k nearest and the
+      number of target sites within radius_km
+    Returns None when either layer is missing or empty.
+    """
+    import pandas as pd
+    layer_config = _load_yaml(YAML_PATH).get("gis_layers", {})
+    if source not in layer_config or target not in layer_config:
+        return None
+    sources = _load_layer(layer_config[source], bbox=bbox)
+    index = get_layer_index(layer_config[target], bbox=bbox)
+    if sources is None or index is None or not len(sources) or not len(index):
+        return None
+
+    k = max(1, int(k))
+    targets = index.layer
+    nearest, distances = index.query_knn(sources.lat, sources.lon, k)
+    within = index.query_radius(sources.lat, sources.lon, radius_km)
+
+    source_names = sources.column('name')
+    if source_names is None:
+        source_names = np.array([f"{source} {i + 1}" for i in range(len(sources))], dtype=object)
+    target_names = targets.column('name')
+    if target_names is None:
+        target_names = np.array([f"{target} {i + 1}" for i in range(len(targets))], dtype=object)
+
+    # query_knn pads with -1 when the target layer has fewer than k sites
+    rows, ranks = np.nonzero(nearest >= 0)
+    hits = nearest[rows, ranks]
+    pairs = pd.DataFrame({
+        "source": source_names[rows], "target": target_names[hits],
+        "rank": ranks + 1, "distance_km": distances[rows, ranks].round(1),
+        "source_lat": sources.lat[rows], "source_lon": sources.lon[rows],
+        "target_lat": targets.lat[hits], "target_lon": targets.lon[hits],
+    })
+    summary = pd.DataFrame({
+        source: source_names,
+        f"nearest {target}": target_names[nearest[:, 0]],
+        "nearest km": distances[:, 0].round(1),
+        f"mean km to {k} nearest": np.nanmean(np.where(nearest >= 0, distances, np.nan), axis=1).round(1),
+        f"within {radius_km:g} km": [len(indices) for indices, _ in within],
+    })
+    return {"pairs": pairs, "summary": summary}
+
+
+# --- 6. Cache Diagnostics ---
+def get_cache_stats():
+    """Returns hit/miss counters of the process-wide loader cache."""
+    return cache_stats()
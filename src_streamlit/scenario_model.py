@@ -0,0 +1,110 @@
+# File: src_streamlit/scenario_model.py
+import numpy as np
+
+# Inputs of the model; logical_qubits x physical_per_logical enter as the physical qubit count
+SCALING_INPUTS = ("penetration", "physical_qubits", "qubit_density")
+
+
+def _per_resource(spec, resources, default):
+    """Expands a scalar or {resource: value, 'default': value} mapping to one value per resource."""
+    if not isinstance(spec, dict):
+        return np.full(len(resources), float(default if spec is None else spec))
+    fallback = float(spec.get("default", default))
+    return np.array([float(spec.get(r, fallback)) for r in resources])
+
+
+class ScenarioModel:
+    """
+    Parametric resource model anchored on the published (scenario, scale) totals of bar_chart_data.
+
+    For each FTQC configuration, every resource is a power law in the deployment inputs:
+
+        value = reference * (penetration / p_ref) ** a_pen
+                          * (physical_qubits / physical_ref) ** a_phys
+                          * qubit_density ** a_dens
+
+    physical_qubits = logical_qubits * physical_per_logical; qubit_density is the cryostat
+    qubit density relative to the configuration's reference cryogenics (2 = half the cryostats).
+    The reference point of a configuration is its highest-penetration scenario, so the default
+    inputs reproduce the table. Relative input uncertainties are propagated into the *Err terms
+    in quadrature (first order for a product of powers).
+
+    evaluate() broadcasts its inputs like NumPy arithmetic: a full parameter grid is one call.
+    """
+
+    def __init__(self, resources, configurations, reference, reference_err, exponents, uncertainty):
+        self.resources = list(resources)
+        self.configurations = configurations  # name -> {logical_qubits, physical_per_logical, penetration}
+        self.reference = reference            # name -> (R,) values at the reference inputs
+        self.reference_err = reference_err    # name -> (R,) errors at the reference inputs
+        self.exponents = exponents            # input -> (R,) exponents
+        self.uncertainty = uncertainty        # input -> relative 1-sigma
+
+    @classmethod
+    def from_config(cls, model_config, chart_data, resources=None):
+        """Builds the model from the `scenario_model` YAML section and bar_chart_data."""
+        penetration = {s: float(p) for s, p in (model_config.get("penetration") or {}).items()}
+        if resources is None:
+            keys = {k for entries in chart_data.values() for e in entries for k in e}
+            resources = sorted(k for k in keys if k != "scale" and not k.endswith("Err"))
+
+        configurations, reference, reference_err = {}, {}, {}
+        for name, spec in (model_config.get("configurations") or {}).items():
+            # Anchor on the highest-penetration scenario reporting this configuration
+            anchors = [(penetration[s], e) for s, entries in chart_data.items() if s in penetration
+                       for e in entries if e.get("scale") == name]
+            if not anchors:
+                continue
+            p_ref, entry = max(anchors, key=lambda a: a[0])
+            configurations[name] = {
+                "logical_qubits": float(spec["logical_qubits"]),
+                "physical_per_logical": float(spec["physical_per_logical"]),
+                "penetration": p_ref,
+            }
+            reference[name] = np.array([float(entry.get(r, 0) or 0) for r in resources])
+            reference_err[name] = np.array([float(entry.get(f"{r}Err", 0) or 0) for r in resources])
+
+        scaling = model_config.get("scaling") or {}
+        defaults = {"penetration": 1.0, "physical_qubits": 1.0, "qubit_density": -1.0}
+        exponents = {k: _per_resource(scaling.get(k), resources, defaults[k]) for k in SCALING_INPUTS}
+        uncertainty = {k: float(v) for k, v in (model_config.get("uncertainty") or {}).items()}
+        return cls(resources, configurations, reference, reference_err, exponents, uncertainty)
+
+    def defaults(self, configuration):
+        """Reference inputs of a configuration (the values that reproduce the table)."""
+        ref = self.configurations[configuration]
+        return {"penetration": ref["penetration"], "logical_qubits": ref["logical_qubits"],
+                "physical_per_logical": ref["physical_per_logical"], "qubit_density": 1.0}
+
+    def evaluate(self, configuration, penetration=None, logical_qubits=None, physical_per_logical=None,
+                 qubit_density=1.0):
+        """
+        Returns (values, errors), each of shape broadcast(inputs) + (len(resources),).
+        Omitted inputs default to the configuration's reference assumptions.
+        """
+        ref = self.configurations[configuration]
+        inputs = {
+            "penetration": ref["penetration"] if penetration is None else penetration,
+            "logical_qubits": ref["logical_qubits"] if logical_qubits is None else logical_qubits,
+            "physical_per_logical": ref["physical_per_logical"] if physical_per_logical is None
+            else physical_per_logical,
+            "qubit_density": qubit_density,
+        }
+        pen, logical, ratio, density = (np.asarray(inputs[k], dtype="float64")[..., None]
+                                        for k in ("penetration", "logical_qubits", "physical_per_logical",
+                                                  "qubit_density"))
+        a = self.exponents
+        with np.errstate(divide="ignore"):
+            factor = ((pen / ref["penetration"]) ** a["penetration"]
+                      * (logical * ratio / (ref["logical_qubits"] * ref["physical_per_logical"]))
+                      ** a["physical_qubits"]
+                      * density ** a["qubit_density"])
+        values = self.reference[configuration] * factor
+
+        u = self.uncertainty
+        u_phys = np.hypot(u.get("logical_qubits", 0.0), u.get("physical_per_logical", 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ref_rel = np.nan_to_num(self.reference_err[configuration] / self.reference[configuration])
+        rel = np.sqrt(ref_rel ** 2 + (a["penetration"] * u.get("penetration", 0.0)) ** 2
+                      + (a["physical_qubits"] * u_phys) ** 2 + (a["qubit_density"] * u.get("qubit_density", 0.0)) ** 2)
+        return values, np.abs(values) * rel
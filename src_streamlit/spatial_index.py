@@ -0,0 +1,165 @@
+# File: src_streamlit/spatial_index.py
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180.0
+MAX_DISTANCE_KM = np.pi * EARTH_RADIUS_KM  # half the circumference: every point is within this radius
+BATCH_ELEMENTS = 4_000_000  # max (queries x candidates) distances computed at once
+# Grid cell size bounds (degrees); by default cells are sized for ~POINTS_PER_CELL points each
+MIN_CELL_DEG, MAX_CELL_DEG, POINTS_PER_CELL = 0.05, 1.0, 32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments broadcast like NumPy arithmetic."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype="float64")) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """
+    Bucket grid over the points of a PointLayer for haversine radius and k-nearest queries.
+
+    Points are sorted by their (lat, lon) cell once. Queries are batched per grid cell: the
+    points in cells that can fall within the search radius of that cell (longitude span widened
+    with latitude, wrapping at the antimeridian) are gathered once, and distances for all queries
+    of the cell are one vectorized computation. Built once per layer and shared read-only.
+    """
+
+    def __init__(self, layer, cell_deg=None):
+        self.layer = layer
+        self.cell = float(cell_deg or self._auto_cell(layer))
+        self.n_rows = int(np.ceil(180.0 / self.cell))
+        self.n_cols = int(np.ceil(360.0 / self.cell))
+        keys = self._row(layer.lat) * self.n_cols + self._col(layer.lon)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    @staticmethod
+    def _auto_cell(layer):
+        """Cell size (degrees) giving about POINTS_PER_CELL points per cell over the layer's extent."""
+        if len(layer) < 2:
+            return MAX_CELL_DEG
+        extent = (np.ptp(layer.lat) + MIN_CELL_DEG) * (np.ptp(layer.lon) + MIN_CELL_DEG)
+        return float(np.clip(np.sqrt(extent * POINTS_PER_CELL / len(layer)), MIN_CELL_DEG, MAX_CELL_DEG))
+
+    def __len__(self):
+        return len(self._order)
+
+    @property
+    def nbytes(self):
+        """
+        Memory of the index arrays plus the indexed layer: the index keeps its layer alive, also
+        after the layer's own cache entry is evicted, so the layer is counted here as well.
+        """
+        return self._order.nbytes + self._keys.nbytes + self.layer.nbytes
+
+    @property
+    def mapped_nbytes(self):
+        return self.layer.mapped_nbytes
+
+    def _row(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90.0) / self.cell), 0, self.n_rows - 1).astype("int64")
+
+    def _col(self, lon):
+        return (np.floor((np.asarray(lon) + 180.0) / self.cell).astype("int64")) % self.n_cols
+
+    def _candidates(self, south, north, west, east, radius_km):
+        """Indices of the points in every cell within radius_km of the box [south, north] x [west, east]."""
+        dlat = radius_km / KM_PER_DEGREE
+        rows = np.arange(self._row(south - dlat), self._row(north + dlat) + 1)
+
+        max_abs_lat = max(abs(south), abs(north)) + dlat
+        dlon = dlat / np.cos(np.radians(max_abs_lat)) if max_abs_lat < 89.9 else 360.0
+        if dlon + (east - west) / 2 >= 180.0:
+            cols = np.arange(self.n_cols)
+        else:
+            first = int(np.floor((west - dlon + 180.0) / self.cell))
+            last = int(np.floor((east + dlon + 180.0) / self.cell))
+            cols = np.unique(np.arange(first, last + 1) % self.n_cols)
+
+        cells = (rows[:, None] * self.n_cols + cols[None, :]).ravel()
+        lo = np.searchsorted(self._keys, cells, side="left")
+        lengths = np.searchsorted(self._keys, cells, side="right") - lo
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype="int64")
+        # Concatenate the [lo, hi) runs of the sorted order without a Python loop
+        offsets = np.repeat(lo - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return self._order[offsets + np.arange(total)]
+
+    def _batches(self, lat, lon):
+        """
+        Groups query points by grid cell: yields (query positions, cell box) so candidates are
+        gathered once per occupied query cell and distances computed as one (queries x candidates)
+        matrix per batch (batches are split to bound that matrix).
+        """
+        keys = self._row(lat) * self.n_cols + self._col(lon)
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.r_[True, keys[order][1:] != keys[order][:-1], True])
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            queries = order[start:stop]
+            row, col = divmod(int(keys[queries[0]]), self.n_cols)
+            south, west = row * self.cell - 90.0, col * self.cell - 180.0
+            yield queries, (south, min(south + self.cell, 90.0), west, west + self.cell)
+
+    def _distances(self, lat, lon, queries, candidates):
+        return haversine_km(lat[queries, None], lon[queries, None],
+                            self.layer.lat[candidates][None, :], self.layer.lon[candidates][None, :])
+
+    def query_radius(self, lat, lon, radius_km):
+        """
+        Points within radius_km of each query point.
+        Returns a list (one entry per query) of (indices, distances_km), sorted by distance.
+        """
+        lat, lon = np.atleast_1d(np.asarray(lat, dtype="float64")), np.atleast_1d(np.asarray(lon, dtype="float64"))
+        results = [None] * len(lat)
+        for queries, box in self._batches(lat, lon):
+            candidates = self._candidates(*box, radius_km)
+            for chunk in np.array_split(queries, max(1, len(queries) * len(candidates) // BATCH_ELEMENTS)):
+                d = self._distances(lat, lon, chunk, candidates)
+                q, c = np.nonzero(d <= radius_km)
+                hits = d[q, c]
+                order = np.lexsort((hits, q))  # by query, then by distance
+                q, c, hits = q[order], c[order], hits[order]
+                splits = np.searchsorted(q, np.arange(1, len(chunk)))
+                for position, idx, dist in zip(chunk.tolist(), np.split(candidates[c], splits), np.split(hits, splits)):
+                    results[position] = (idx, dist)
+        return results
+
+    def query_knn(self, lat, lon, k):
+        """
+        k nearest points to each query point.
+        Returns (indices, distances_km) arrays of shape (queries, k), nearest first; slots
+        beyond the number of indexed points hold -1 / inf.
+        """
+        lat, lon = np.atleast_1d(np.asarray(lat, dtype="float64")), np.atleast_1d(np.asarray(lon, dtype="float64"))
+        indices = np.full((len(lat), k), -1, dtype="int64")
+        distances = np.full((len(lat), k), np.inf)
+        if len(self) == 0 or k <= 0:
+            return indices, distances
+
+        for queries, box in self._batches(lat, lon):
+            # Grow the search radius until it holds k points for every query of the cell:
+            # anything outside is then farther away than the k found
+            radius = self.cell * KM_PER_DEGREE
+            pending = queries
+            while len(pending):
+                candidates = self._candidates(*box, radius)
+                final = radius >= MAX_DISTANCE_KM
+                for chunk in np.array_split(pending, max(1, len(pending) * len(candidates) // BATCH_ELEMENTS)):
+                    d = self._distances(lat, lon, chunk, candidates)
+                    done = (np.count_nonzero(d <= radius, axis=1) >= k) | final
+                    if not done.any():
+                        continue
+                    d = d[done]
+                    n = min(k, d.shape[1])
+                    nearest = np.argpartition(d, n - 1, axis=1)[:, :n] if d.shape[1] > n else \
+                        np.broadcast_to(np.arange(d.shape[1]), d.shape)
+                    nd = np.take_along_axis(d, nearest, axis=1)
+                    order = np.argsort(nd, axis=1, kind="stable")
+                    indices[chunk[done], :n] = candidates[np.take_along_axis(nearest, order, axis=1)]
+                    distances[chunk[done], :n] = np.take_along_axis(nd, order, axis=1)
+                pending = pending[indices[pending, 0] < 0]
+                radius *= 2
+        return indices, distances
@@ -0,0 +1,83 @@
+import unittest
+from pathlib import Path
+
+from data_utils.data_from_web_converter import (
+    decode_flourish_object, extract_flourish_data, flourish_points_to_frame
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class DecodeFlourishObjectTest(unittest.TestCase):
+    def test_stops_at_end_of_object(self):
+        text = 'x = {"a": [1, {"b": 2}]}, y = {"c": 3};'
+        self.assertEqual(decode_flourish_object(text), {"a": [1, {"b": 2}]})
+
+    def test_starts_at_offset(self):
+        text = '{"first": 1}; _Flourish_data = {"second": 2}'
+        self.assertEqual(decode_flourish_object(text, text.index("_Flourish")), {"second": 2})
+
+    def test_brackets_and_escaped_quotes_inside_strings(self):
+        text = r'{"label": "a } ] \" { [ b", "path": "c:\\d"} trailing }'
+        self.assertEqual(decode_flourish_object(text), {"label": 'a } ] " { [ b', "path": "c:\\d"})
+
+    def test_new_date_becomes_milliseconds(self):
+        text = '{"dates": [new Date(1577836800000), new Date(-86400000)], "text": "new Date(5)"}'
+        self.assertEqual(decode_flourish_object(text),
+                         {"dates": [1577836800000, -86400000], "text": "new Date(5)"})
+
+    def test_missing_or_unterminated_object(self):
+        self.assertIsNone(decode_flourish_object("no object here"))
+        self.assertIsNone(decode_flourish_object('{"a": [1, 2}'))
+
+
+class ExtractFlourishDataTest(unittest.TestCase):
+    def setUp(self):
+        self.html = (FIXTURES / "flourish_embed.html").read_text(encoding="utf-8")
+
+    def test_decodes_embed_page(self):
+        data = extract_flourish_data(self.html)
+        self.assertEqual(set(data), {"points", "regions"})
+        self.assertEqual(len(data["points"]), 4)
+        first, second = data["points"][:2]
+        self.assertEqual(first["label"], "Quantum Foundry {QF}")
+        self.assertEqual(first["metadata"][5], 1577836800000)
+        self.assertEqual(first["metadata"][6], "Materials [superconducting]")
+        self.assertEqual(second["label"], 'Q-NEXT "Next Generation" Center')
+        self.assertEqual(second["metadata"][4], "Argonne \\ National Lab")
+
+    def test_page_without_data(self):
+        self.assertIsNone(extract_flourish_data("<html><script>var x = {};</script></html>"))
+
+
+class FlourishPointsToFrameTest(unittest.TestCase):
+    COLUMNS = ["Name", "Institution", "Agency", "Focus Area", "Founding Date", "Funding",
+               "Latitude", "Longitude", "Website", "Agency Full"]
+
+    def test_embed_page_points(self):
+        points = extract_flourish_data((FIXTURES / "flourish_embed.html").read_text(encoding="utf-8"))["points"]
+        df = flourish_points_to_frame(points)
+        self.assertEqual(list(df.columns), self.COLUMNS)
+        self.assertEqual(df["Founding Date"].tolist(), ["2020-01-01", "1969-12-31", "", ""])
+        self.assertEqual(df["Agency"].tolist(), ["NSF", "DOE", "NIST", ""])
+        self.assertEqual(df["Website"].tolist(), ["https://quantumfoundry.ucsb.edu", "https://q-next.org", "", ""])
+        self.assertEqual(df["Latitude"].tolist(), [34.41, 41.71, 40.0, 38.99])
+
+    def test_missing_and_short_metadata(self):
+        points = [{"label": "a", "lat": 1.0, "lon": 2.0, "metadata": None},
+                  {"label": "b", "lat": 3.0, "lon": 4.0, "metadata": ["$1M", None, None, None, None, "2020"]},
+                  {"lat": 5.0, "lon": 6.0}]
+        df = flourish_points_to_frame(points)
+        self.assertEqual(df["Name"].tolist(), ["a", "b", "N/A"])
+        self.assertEqual(df["Funding"].tolist(), ["", "$1M", ""])
+        self.assertEqual(df["Institution"].tolist(), ["", "", ""])
+        self.assertEqual(df["Founding Date"].tolist(), ["", "", ""])  # non-numeric dates are dropped
+
+    def test_empty_points(self):
+        df = flourish_points_to_frame([])
+        self.assertEqual(list(df.columns), self.COLUMNS)
+        self.assertEqual(len(df), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
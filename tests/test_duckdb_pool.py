@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src_streamlit.duckdb_pool import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.pool = ConnectionPool(str(self.tmp / "pool.duckdb"), max_size=2, timeout=0.2)
+        with self.pool.connection() as con:
+            con.execute("CREATE TABLE points AS SELECT range AS id FROM range(10)")
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_checkout_and_release_accounting(self):
+        first = self.pool.checkout()
+        self.assertEqual(self.pool.stats(), {"created": 1, "idle": 0, "in_use": 1, "max_size": 2})
+        second = self.pool.checkout()
+        self.assertEqual(self.pool.stats()["created"], 2)
+        self.assertEqual(second.execute("SELECT count(*) FROM points").fetchone(), (10,))
+        self.pool.release(first)
+        self.pool.release(second)
+        self.assertEqual(self.pool.stats(), {"created": 2, "idle": 2, "in_use": 0, "max_size": 2})
+        # Idle connections are reused, most recently released first
+        self.assertIs(self.pool.checkout(), second)
+
+    def test_exhausted_pool_blocks_then_times_out(self):
+        held = [self.pool.checkout(), self.pool.checkout()]
+        with self.assertRaises(TimeoutError):
+            self.pool.checkout()
+
+        threading.Timer(0.05, self.pool.release, args=(held[0],)).start()
+        self.assertIs(self.pool.checkout(), held[0])  # waits for the release instead of failing
+        self.assertEqual(self.pool.stats()["in_use"], 2)
+
+    def test_broken_connection_is_replaced(self):
+        con = self.pool.checkout()
+        self.pool.release(con)
+        con.close()  # e.g. dropped by the server while idle
+        replacement = self.pool.checkout()
+        self.assertIsNot(replacement, con)
+        self.assertEqual(replacement.execute("SELECT count(*) FROM points").fetchone(), (10,))
+        self.assertEqual(self.pool.stats()["created"], 2)
+
+    def test_failed_query_releases_broken_connection(self):
+        with self.assertRaises(Exception):
+            with self.pool.connection() as con:
+                con.close()
+                con.execute("SELECT 1")
+        self.assertEqual(self.pool.stats(), {"created": 1, "idle": 0, "in_use": 0, "max_size": 2})
+
+    def test_close(self):
+        in_use = self.pool.checkout()
+        self.pool.release(self.pool.checkout())
+        self.pool.close()
+        self.assertEqual(self.pool.stats()["idle"], 0)
+        with self.assertRaises(RuntimeError):
+            self.pool.checkout()
+        # Connections still in use are closed when they come back
+        self.pool.release(in_use)
+        self.assertEqual(self.pool.stats(), {"created": 2, "idle": 0, "in_use": 0, "max_size": 2})
+        with self.assertRaises(Exception):
+            in_use.execute("SELECT 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from src_streamlit.point_layer import PointLayer
+
+
+def _collection(*properties):
+    return {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [float(i), float(i)]}, "properties": p}
+        for i, p in enumerate(properties)
+    ]}
+
+
+class FromGeojsonTest(unittest.TestCase):
+    def test_list_properties_stay_one_value_per_point(self):
+        for tags in ((["a", "b"], ["c"]), (["a", "b"], ["c", "d"])):
+            layer = PointLayer.from_geojson(_collection(*({"tags": t} for t in tags)))
+            column = layer.column("tags")
+            self.assertEqual(column.shape, (2,))
+            self.assertEqual(list(column), list(tags))
+
+    def test_column_types(self):
+        layer = PointLayer.from_geojson(_collection(
+            {"count": 1, "share": 0.5, "name": "a", "open": True, "meta": {"k": 1}},
+            {"count": 2, "share": None, "name": None, "open": False, "meta": {"k": 2}},
+        ))
+        self.assertEqual(layer.column("count").dtype, np.int64)
+        self.assertTrue(np.isnan(layer.column("share")[1]))
+        self.assertEqual(list(layer.column("name")), ["a", None])
+        self.assertEqual(layer.column("open").dtype, bool)
+        self.assertEqual(list(layer.column("meta")), [{"k": 1}, {"k": 2}])
+
+    def test_features_without_coordinates_are_skipped(self):
+        gj = _collection({"name": "a"}, {"name": "b"})
+        gj["features"][0]["geometry"] = None
+        layer = PointLayer.from_geojson(gj)
+        self.assertEqual(len(layer), 1)
+        self.assertEqual(list(layer.column("name")), ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from data_utils.web_client import CachedHttpClient
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Local stand-in for the scraped sites; the server object keeps the request log and failure counts."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/page":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._send(200, "page body", {"ETag": '"v1"'})
+        elif self.path == "/flaky":
+            with server.lock:
+                server.failures -= 1
+                failing = server.failures >= 0
+            self._send(503, "busy") if failing else self._send(200, "recovered")
+        else:
+            self._send(404, "not found")
+
+    def _send(self, status, text, headers=None):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CachedHttpClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+        self.server.lock, self.server.requests, self.server.failures = threading.Lock(), [], 2
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.client = CachedHttpClient(cache_dir=self.cache_dir, timeout=5, retries=3, backoff=0)
+
+    def tearDown(self):
+        self._stop_server()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _stop_server(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def test_etag_revalidation_serves_cached_body(self):
+        self.assertEqual(self.client.get_text(f"{self.base}/page"), "page body")
+        self.assertEqual(self.client.get_text(f"{self.base}/page"), "page body")
+        self.assertEqual(self.server.requests, [("/page", None), ("/page", '"v1"')])
+
+    def test_retries_after_503(self):
+        self.assertEqual(self.client.get_text(f"{self.base}/flaky"), "recovered")
+        self.assertEqual([path for path, _ in self.server.requests], ["/flaky"] * 3)
+
+    def test_retries_exhausted(self):
+        self.server.failures = 10
+        with self.assertRaises(requests.RequestException):
+            self.client.get_text(f"{self.base}/flaky")
+        self.assertEqual(len(self.server.requests), 4)  # first attempt + 3 retries
+
+    def test_fetch_all_returns_error_per_url(self):
+        pages = self.client.fetch_all([f"{self.base}/page", f"{self.base}/missing"])
+        self.assertEqual(pages[f"{self.base}/page"], "page body")
+        self.assertIsInstance(pages[f"{self.base}/missing"], requests.HTTPError)
+
+    def test_cached_copy_when_server_is_down(self):
+        url = f"{self.base}/page"
+        self.client.get_text(url)
+        self._stop_server()
+        offline = CachedHttpClient(cache_dir=self.cache_dir, timeout=1, retries=0)
+        self.assertEqual(offline.get_text(url), "page body")
+        with self.assertRaises(requests.RequestException):
+            offline.get_text(f"{self.base}/never-fetched")
+
+
+if __name__ == "__main__":
+    unittest.main()